@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Telar Demos Generator Benchmarks
+
+Times the stages of build-demos.py against synthetic corpora, so that
+performance changes can be measured and compared across commits.
+
+Usage:
+    python benchmark-demos.py                              # Default corpus
+    python benchmark-demos.py --steps 5000 --terms 2000    # Larger bundle corpus
+    python benchmark-demos.py --megapixels 1000 --backends libvips,numpy
+    python benchmark-demos.py --output results.json        # Save results
+    python benchmark-demos.py --compare baseline.json      # Compare with saved results
+
+Results are written as JSON: one entry per benchmark with the timings of
+every repeat plus min/median, and the corpus parameters and git commit
+they were measured with.
+
+Version: v0.9.0
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent
+
+BENCH_VERSION = "0.0.0"
+BENCH_LANG = "en"
+
+WORDS = (
+    "map painting savanna encomienda lineage archive tribute cacique land "
+    "boundary river colonial crown notary witness parish livestock loom "
+    "gold textile ledger survey province audiencia council testimony"
+).split()
+
+
+def load_generator():
+    """Import build-demos.py as a module (its file name is not importable)."""
+    spec = importlib.util.spec_from_file_location("build_demos", SCRIPT_DIR / "build-demos.py")
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _markdown_body(rng, paragraphs, term_ids):
+    """Synthetic layer text with emphasis, lists and glossary links."""
+    parts = []
+    for _ in range(paragraphs):
+        text = _sentence(rng, 40)
+        if term_ids:
+            term = rng.choice(term_ids)
+            text += f" See [[{term}]] and [[{rng.choice(term_ids)}|the related term]]."
+        parts.append(text)
+    parts.append("- " + _sentence(rng, 6) + "\n- **" + _sentence(rng, 4) + "**")
+    return '\n\n'.join(parts)
+
+
+def write_bundle_corpus(root, stories, steps, terms, objects, seed=0):
+    """
+    Write a synthetic demos/v<BENCH_VERSION>/<lang>/ tree under root.
+
+    Steps are spread evenly over the stories; half of the layers point to
+    .md files and half hold inline markdown, as in the real demos.
+    """
+    rng = random.Random(seed)
+    lang_dir = root / "demos" / f"v{BENCH_VERSION}" / BENCH_LANG
+    stories_dir = lang_dir / "texts" / "stories"
+    stories_dir.mkdir(parents=True)
+
+    term_ids = [f"term-{i}" for i in range(terms)]
+    object_ids = [f"object-{i}" for i in range(objects)]
+
+    with open(lang_dir / "glossary.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['term_id', 'title', 'definition'])
+        for term_id in term_ids:
+            writer.writerow([term_id, term_id.replace('-', ' ').title(),
+                             _markdown_body(rng, 2, term_ids)])
+
+    with open(lang_dir / "demo-objects.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['object_id', 'title', 'description', 'source_url', 'creator', 'year'])
+        for object_id in object_ids:
+            writer.writerow([object_id, _sentence(rng, 5), _sentence(rng, 25),
+                             f"https://example.org/iiif/{object_id}/manifest.json",
+                             _sentence(rng, 3), str(rng.randint(1500, 1900))])
+
+    steps_per_story = max(1, steps // max(1, stories))
+    with open(lang_dir / "demo-project.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['order', 'story_id', 'title', 'subtitle', 'byline'])
+        for s in range(stories):
+            story_id = f"story-{s}"
+            writer.writerow([s + 1, story_id, _sentence(rng, 4), _sentence(rng, 10), 'by Bench'])
+
+            (stories_dir / story_id).mkdir()
+            with open(lang_dir / f"{story_id}.csv", 'w', encoding='utf-8', newline='') as sf:
+                story_writer = csv.writer(sf)
+                story_writer.writerow(['step', 'object', 'x', 'y', 'zoom', 'question', 'answer',
+                                       'layer1_button', 'layer1_content',
+                                       'layer2_button', 'layer2_content'])
+                for step in range(1, steps_per_story + 1):
+                    md_name = f"{story_id}/step_{step}.md"
+                    (stories_dir / md_name).write_text(
+                        f"---\ntitle: Step {step}\n---\n\n" + _markdown_body(rng, 4, term_ids),
+                        encoding='utf-8')
+                    story_writer.writerow([
+                        step, rng.choice(object_ids), round(rng.random(), 3),
+                        round(rng.random(), 3), rng.choice([1, 1.5, 2, 3]),
+                        _sentence(rng, 8), _sentence(rng, 20),
+                        'Learn more', md_name,
+                        'Go deeper', _markdown_body(rng, 1, term_ids),
+                    ])
+    return lang_dir
+
+
+# Largest synthetic image built in memory when the vips command is missing
+MAX_IN_MEMORY_MEGAPIXELS = 1000
+
+
+def _image_bands(width, height, seed, band=1024):
+    """Yield (top, pixels) horizontal bands of the synthetic test image."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    for top in range(0, height, band):
+        rows = min(band, height - top)
+        y = np.linspace(top, top + rows, rows, dtype=np.float32)[:, None] % 256
+        noise = rng.integers(0, 48, (rows, width, 3), dtype=np.uint8)
+        pixels = np.empty((rows, width, 3), dtype=np.uint8)
+        pixels[..., 0] = (x[None, :] + y) % 256
+        pixels[..., 1] = np.abs(x[None, :] - y) % 256
+        pixels[..., 2] = (x[None, :] * 0.5 + y * 0.5) % 256
+        yield top, np.clip(pixels.astype(np.int16) + noise - 24, 0, 255).astype(np.uint8)
+
+
+def write_image(path, megapixels, seed=0):
+    """Write a synthetic RGB JPEG of roughly the given size (3:4 aspect).
+
+    With the vips command available, the pixels are generated in
+    horizontal bands and streamed to a binary PPM next to path, which
+    vips then encodes to JPEG a region at a time. Memory stays at a few
+    bands whatever the size, but the PPM needs 3 bytes per pixel of disk
+    space while it exists.
+
+    Without vips the image is assembled in memory by Pillow (3 bytes per
+    pixel), so sizes above MAX_IN_MEMORY_MEGAPIXELS are refused.
+    """
+    from PIL import Image
+
+    width = int((megapixels * 1_000_000 * 3 / 4) ** 0.5)
+    height = int(width * 4 / 3)
+
+    if shutil.which('vips'):
+        ppm_path = path.with_suffix('.ppm')
+        try:
+            with open(ppm_path, 'wb') as f:
+                f.write(f"P6\n{width} {height}\n255\n".encode('ascii'))
+                for _top, pixels in _image_bands(width, height, seed):
+                    f.write(pixels.tobytes())
+            result = subprocess.run(['vips', 'jpegsave', str(ppm_path), str(path), '--Q', '90'],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"vips jpegsave failed: {result.stderr}")
+        finally:
+            ppm_path.unlink(missing_ok=True)
+        return width, height
+
+    if megapixels > MAX_IN_MEMORY_MEGAPIXELS:
+        raise SystemExit(f"Error: a {megapixels} MP test image needs the vips command to be "
+                         f"written with low memory (without it the limit is "
+                         f"{MAX_IN_MEMORY_MEGAPIXELS} MP)")
+    img = Image.new('RGB', (width, height))
+    for top, pixels in _image_bands(width, height, seed):
+        img.paste(Image.fromarray(pixels, 'RGB'), (0, top))
+    img.save(path, 'JPEG', quality=90)
+    return width, height
+
+
+def legacy_process_glossary_links(text, glossary_terms):
+    """process_glossary_links() as of v0.9.0, kept as the benchmark baseline."""
+    if not text or not glossary_terms:
+        return text
+
+    pattern = r'\[\[\s*([^|\]]+?)(?:\s*\|\s*([^|\]]+?))?\s*\]\]'
+
+    def replace_glossary_link(match):
+        if match.group(2):
+            term_id = match.group(1).strip()
+            display_text = match.group(2).strip()
+        else:
+            term_id = match.group(1).strip()
+            display_text = glossary_terms.get(term_id, term_id)
+
+        if term_id in glossary_terms:
+            return f'<a href="#" class="glossary-inline-link" data-term-id="{term_id}">{display_text}</a>'
+        else:
+            return f'<a href="#" class="glossary-inline-link" data-term-id="{term_id}">{display_text}</a>'
+
+    return re.sub(pattern, replace_glossary_link, text)
+
+
+def time_runs(func, repeat):
+    """Run func repeat times with its output silenced; return the timings."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings, **extra):
+    result = {
+        "runs": [round(t, 6) for t in timings],
+        "min": round(min(timings), 6),
+        "median": round(statistics.median(timings), 6),
+    }
+    result.update(extra)
+    return result
+
+
+def bench_bundles(gen, root, args, results):
+    """Time CSV reading, bundle generation, validation and serialization."""
+    lang_dir = root / "demos" / f"v{BENCH_VERSION}" / BENCH_LANG
+    base_url = gen.DEFAULT_BASE_URL
+
+    glossary = gen.read_glossary_csv(lang_dir / "glossary.csv")
+    glossary_terms = {term_id: data['term'] for term_id, data in glossary.items()}
+    story_csvs = sorted(lang_dir.glob("story-*.csv"))
+    texts_dir = lang_dir / "texts" / "stories"
+
+    def read_stories():
+        for story_csv in story_csvs:
+            gen.read_story_csv(story_csv, texts_dir, glossary_terms)
+
+    results["read_story_csv"] = summarize(time_runs(read_stories, args.repeat),
+                                          steps=args.steps)
+    results["read_glossary_csv"] = summarize(
+        time_runs(lambda: gen.read_glossary_csv(lang_dir / "glossary.csv"), args.repeat),
+        terms=args.terms)
+
+    bundle_holder = {}
+
+    def build():
+        bundle_holder['bundle'], _ = gen.generate_bundle(BENCH_VERSION, BENCH_LANG, lang_dir, base_url)
+
+    results["generate_bundle"] = summarize(time_runs(build, args.repeat))
+    bundle = bundle_holder['bundle']
+
+    results["validate_bundle"] = summarize(
+        time_runs(lambda: gen.validate_bundle(bundle, BENCH_LANG), args.repeat))
+    results["validate_bundle_schema"] = summarize(
+        time_runs(lambda: gen.validate_bundle(bundle, BENCH_LANG, schema=True), args.repeat))
+
+    # Pretty and compact serialization with each available JSON backend
+    backends = ['json'] + (['orjson'] if gen.ORJSON_AVAILABLE else [])
+    default_backend = gen.JSON_BACKEND
+    pretty_outputs = {}
+    try:
+        for backend in backends:
+            gen.JSON_BACKEND = backend
+            for pretty, mode in ((True, 'pretty'), (False, 'compact')):
+                encoded = {}
+
+                def serialize():
+                    encoded['text'] = gen.dumps_json(bundle, pretty=pretty)
+
+                name = f"serialize_bundle_{mode}_{backend}"
+                results[name] = summarize(time_runs(serialize, args.repeat))
+                results[name]["bytes"] = len(encoded['text'].encode('utf-8'))
+                if pretty:
+                    pretty_outputs[backend] = encoded['text']
+    finally:
+        gen.JSON_BACKEND = default_backend
+    if len(set(pretty_outputs.values())) > 1:
+        print("  Warning: JSON backends produced different pretty output")
+
+    results["generate_bundles_for_version"] = summarize(
+        time_runs(lambda: gen.generate_bundles_for_version(BENCH_VERSION, base_url, force=True),
+                  args.repeat))
+    # Second and later runs find every input unchanged
+    results["generate_bundles_for_version_unchanged"] = summarize(
+        time_runs(lambda: gen.generate_bundles_for_version(BENCH_VERSION, base_url), args.repeat))
+
+
+def bench_glossary_links(gen, args, results):
+    """Compare glossary link rewriting: legacy function vs a reused GlossaryLinker."""
+    rng = random.Random(1)
+    term_ids = [f"term-{i}" for i in range(args.terms)]
+    glossary_terms = {term_id: term_id.replace('-', ' ').title() for term_id in term_ids}
+    # Some titles carry markup characters, so the output check covers them
+    for term_id in term_ids[::10]:
+        glossary_terms[term_id] += " & <Sons>"
+    # Two layer bodies per step, as rendered HTML
+    bodies = [f"<p>{_markdown_body(rng, 3, term_ids)}</p>" for _ in range(args.steps * 2)]
+
+    expected = [legacy_process_glossary_links(body, glossary_terms) for body in bodies]
+    linker = gen.GlossaryLinker(glossary_terms)
+    if list(linker.link_all(bodies)) != expected:
+        print("  Warning: GlossaryLinker output differs from the legacy implementation")
+
+    results["glossary_links_legacy"] = summarize(
+        time_runs(lambda: [legacy_process_glossary_links(body, glossary_terms) for body in bodies],
+                  args.repeat), texts=len(bodies))
+    results["glossary_links_linker"] = summarize(
+        time_runs(lambda: list(gen.GlossaryLinker(glossary_terms).link_all(bodies)), args.repeat),
+        texts=len(bodies))
+
+
+def bench_tiles(gen, root, args, results):
+    """Time generate_iiif_for_image() with each requested tile backend."""
+    sources = root / "iiif" / "sources"
+    sources.mkdir(parents=True, exist_ok=True)
+    image_path = sources / "bench-image.jpg"
+    print(f"Writing {args.megapixels} MP synthetic image...")
+    width, height = write_image(image_path, args.megapixels)
+
+    for backend in args.backends:
+        if not gen._tile_backend_available(backend):
+            print(f"  Skipping backend '{backend}' (not available)")
+            continue
+        timings = []
+        for _ in range(args.repeat):
+            output_dir = root / "iiif" / "objects" / "bench-image"
+            if output_dir.exists():
+                shutil.rmtree(output_dir)
+            output_dir.mkdir(parents=True)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                gen.generate_iiif_for_image(image_path, output_dir, "bench-image",
+                                            gen.DEFAULT_BASE_URL, backend)
+            timings.append(time.perf_counter() - start)
+        results[f"tiles_{backend}"] = summarize(timings, width=width, height=height,
+                                                megapixels=args.megapixels)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results, baseline=None):
+    print("\n" + "=" * 68)
+    header = f"{'benchmark':40} {'min (s)':>10} {'median (s)':>11}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    print("-" * 68)
+    for name, result in results.items():
+        line = f"{name:40} {result['min']:>10.4f} {result['median']:>11.4f}"
+        if baseline:
+            base = baseline.get(name)
+            if base and base.get('median'):
+                line += f" {result['median'] / base['median']:>7.2f}x"
+            else:
+                line += f" {'—':>8}"
+        print(line)
+    print("=" * 68)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Telar demos generator on synthetic corpora")
+    parser.add_argument("--stories", type=int, default=20, help="Stories in the bundle corpus (default: 20)")
+    parser.add_argument("--steps", type=int, default=2000, help="Total story steps (default: 2000)")
+    parser.add_argument("--terms", type=int, default=500, help="Glossary terms (default: 500)")
+    parser.add_argument("--objects", type=int, default=200, help="Objects in demo-objects.csv (default: 200)")
+    parser.add_argument("--megapixels", type=float, default=16,
+                        help="Synthetic image size for tile benchmarks (default: 16)")
+    parser.add_argument("--backends", type=lambda v: [b for b in v.split(',') if b],
+                        default=['libvips', 'numpy', 'iiif'],
+                        help="Tile backends to time (default: libvips,numpy,iiif)")
+    parser.add_argument("--skip-bundles", action="store_true", help="Skip bundle benchmarks")
+    parser.add_argument("--skip-tiles", action="store_true", help="Skip tile benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (default: 3)")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic corpus directory")
+    args = parser.parse_args()
+
+    gen = load_generator()
+
+    root = Path(tempfile.mkdtemp(prefix="telar-bench-"))
+    # Point the generator at the synthetic tree
+    gen.DEMOS_DIR = root / "demos"
+    gen.IIIF_DIR = root / "iiif"
+    gen.IIIF_BUILD_STATE_PATH = gen.IIIF_DIR / "build-state.json"
+    gen.BUNDLE_BUILD_STATE_PATH = gen.DEMOS_DIR / "build-state.json"
+
+    print(f"Telar Demos Generator benchmarks (generator v{gen.GENERATOR_VERSION})")
+    print(f"Corpus: {root}")
+
+    results = {}
+    try:
+        if not args.skip_bundles:
+            print(f"Writing bundle corpus: {args.stories} stories, {args.steps} steps, "
+                  f"{args.terms} terms, {args.objects} objects...")
+            write_bundle_corpus(root, args.stories, args.steps, args.terms, args.objects)
+            bench_bundles(gen, root, args, results)
+            bench_glossary_links(gen, args, results)
+        if not args.skip_tiles:
+            bench_tiles(gen, root, args, results)
+    finally:
+        if args.keep:
+            print(f"Corpus kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            "generated": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            "commit": git_commit(),
+            "generator": gen.GENERATOR_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "stories": args.stories, "steps": args.steps, "terms": args.terms,
+                "objects": args.objects, "megapixels": args.megapixels,
+                "backends": args.backends, "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
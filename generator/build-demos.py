@@ -13,7 +13,12 @@ Version: v0.9.0
 """
 
 import argparse
+import contextlib
 import csv
+import filecmp
+import gzip
+import hashlib
+import io
 import json
 import os
 import re
@@ -21,6 +26,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -32,6 +38,12 @@ except ImportError:
     print("Warning: markdown library not installed. Content will not be converted to HTML.")
     print("  Install with: pip install markdown")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Version
 GENERATOR_VERSION = "0.9.0"
 BUNDLE_FORMAT_VERSION = "0.2"
@@ -42,9 +54,74 @@ REPO_ROOT = SCRIPT_DIR.parent
 DEMOS_DIR = REPO_ROOT / "demos"
 IIIF_DIR = REPO_ROOT / "iiif"
 
+# Records the inputs each object's IIIF output was built from, so that
+# unchanged objects are skipped and changed ones are rebuilt
+IIIF_BUILD_STATE_PATH = IIIF_DIR / "build-state.json"
+
+# Persistent cache of markdown rendered to HTML (--render-html), kept
+# across runs; safe to delete
+HTML_CACHE_DIR = SCRIPT_DIR / ".cache" / "html"
+
+# Records the files each bundle was built from (with their hashes), so
+# that bundles whose inputs are unchanged are not rewritten
+BUNDLE_BUILD_STATE_PATH = DEMOS_DIR / "build-state.json"
+
 # Default base URL for demos site
 DEFAULT_BASE_URL = "https://content.telar.org"
 
+# Preprocessing memory budget per object (MB). Sources whose decoded size
+# would exceed it are normalized by libvips, which streams the image
+# instead of holding the whole bitmap in RAM.
+DEFAULT_MEMORY_BUDGET_MB = 2048
+
+# Rows converted at a time when Pillow flattens/converts a decoded image
+PREPROCESS_STRIP_ROWS = 256
+
+# IIIF tile settings (match vips dzsave defaults so backends are interchangeable)
+TILE_SIZE = 512
+TILE_JPEG_QUALITY = 75
+
+# Extra pre-rendered full/{w},{h} widths listed in info.json "sizes"
+# (in addition to the pyramid's top level). Empty by default.
+DEFAULT_SIZE_LADDER = []
+
+# Bundle thumbnails use the smallest info.json size at least this wide
+DEFAULT_THUMBNAIL_WIDTH = 400
+
+# Bundle options and their defaults (see build_language_bundle())
+DEFAULT_BUNDLE_OPTIONS = {
+    'reproducible': False,
+    'compress': False,
+    'sharded': False,
+    'dedupe_texts': False,
+    'render_html': False,
+    'schema_check': False,
+}
+
+# JSON serializer used by dumps_json(): 'orjson' (if installed) or 'json'.
+# Output is the same with either; orjson is faster on large bundles.
+JSON_BACKEND = 'orjson' if ORJSON_AVAILABLE else 'json'
+
+# Markdown extensions used for HTML rendering (same as Telar)
+MARKDOWN_EXTENSIONS = ['extra', 'nl2br']
+
+# Optional extra tile encodings: format name -> (Pillow format, IIIF extension)
+EXTRA_TILE_FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'avif': ('AVIF', 'avif'),
+}
+# Largest width or height each extra encoding supports; bigger images
+# (in practice only full/max) are left as JPEG only
+EXTRA_FORMAT_MAX_DIMENSION = {
+    'webp': 16383,
+    'avif': 65536,
+}
+DEFAULT_ENCODER_QUALITY = 80
+DEFAULT_ENCODER_EFFORT = 4  # 0 (fastest) - 6 (smallest), as in WebP "method"
+
+# Tile generation backends in order of preference
+TILE_BACKENDS = ['libvips', 'numpy', 'iiif']
+
 # Bilingual column name mapping (Spanish -> English) — mirrors telar/csv_utils.py
 # Allows demo source CSVs to use either English or Spanish column headers,
 # consistent with the main Telar pipeline (v0.6.0+).
@@ -114,21 +191,246 @@ COLUMN_NAME_MAPPING = {
 }
 
 
-def normalize_row(row):
+def compile_header(fieldnames):
     """
-    Normalize a csv.DictReader row dict to English column names.
+    Resolve a CSV header to English column names, once per file.
 
     Applies COLUMN_NAME_MAPPING to handle both Spanish and English column
     headers, and backward-compatibility aliases (e.g. layer1_file ->
-    layer1_content). Keys not in the mapping are passed through unchanged.
+    layer1_content). Names not in the mapping are kept unchanged. If
+    several columns resolve to the same name, the last one wins.
+
+    Returns:
+        Dict mapping column name -> index in each row
     """
-    normalized = {}
-    for key, value in row.items():
-        if key is None:
-            continue
-        mapped = COLUMN_NAME_MAPPING.get(key.lower().strip())
-        normalized[mapped if mapped else key] = value
-    return normalized
+    index = {}
+    for i, name in enumerate(fieldnames):
+        mapped = COLUMN_NAME_MAPPING.get(name.lower().strip())
+        index[mapped if mapped else name] = i
+    return index
+
+
+class CsvRow:
+    """
+    One CSV data row, read through a compiled header (see read_csv_rows()).
+
+    Supports row.get(column, default) like the dicts csv.DictReader yields;
+    a column in the header that the row is too short to have reads as None,
+    as with DictReader.
+    """
+
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def get(self, column, default=None):
+        i = self._index.get(column)
+        if i is None:
+            return default
+        return self._values[i] if i < len(self._values) else None
+
+
+def read_csv_rows(f):
+    """
+    Yield a CsvRow for each data row of an open CSV file.
+
+    The header is compiled once (see compile_header()); blank lines are
+    skipped, as by csv.DictReader.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    index = compile_header(header)
+    for values in reader:
+        if values:
+            yield CsvRow(values, index)
+
+
+# =============================================================================
+# JSON OUTPUT
+# =============================================================================
+#
+# Every JSON file the generator writes goes through dumps_json(). Pretty
+# output (bundles, manifests, info.json, state files) is byte-identical to
+# json.dumps(indent=2) whichever backend encodes it, so committed files do
+# not change when orjson is installed or removed. Compact output is used
+# for published artifacts nobody reads (minified bundles, shards).
+
+def _orjson_floats_match(value):
+    """
+    Return True if orjson formats every float in value the way json does.
+
+    They differ where repr() switches to exponent notation (1e16 vs 1e+16,
+    0.00001 vs 1e-05) and for NaN and infinities.
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, float):
+            if item != item or (item and not 1e-4 <= abs(item) < 1e16):
+                return False
+    return True
+
+
+def dumps_json(value, pretty=True, sort_keys=False, ensure_ascii=False):
+    """
+    Serialize a value to a JSON string with JSON_BACKEND.
+
+    Args:
+        value: JSON-serializable value
+        pretty: Indent by 2 spaces, as json.dumps(indent=2); otherwise
+            minified, as json.dumps(separators=(',', ':'))
+        sort_keys: Sort object keys
+        ensure_ascii: Escape non-ASCII characters (always done by the json
+            module, which orjson cannot match)
+
+    Returns:
+        The encoded string. With orjson, values it rejects (non-string
+        keys, integers beyond 64 bits) or whose floats it would format
+        differently are encoded by the json module instead, so the result
+        does not depend on the backend.
+    """
+    if JSON_BACKEND == 'orjson' and not ensure_ascii and _orjson_floats_match(value):
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(value, option=option).decode('utf-8')
+        except TypeError:
+            pass
+
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=ensure_ascii,
+                      sort_keys=sort_keys)
+
+
+def dump_json(value, f, **kwargs):
+    """Write dumps_json(value, **kwargs) to an open text file."""
+    f.write(dumps_json(value, **kwargs))
+
+
+# =============================================================================
+# IIIF CATALOG
+# =============================================================================
+#
+# iiif/all-demo-objects.csv and each object's info.json are read by the
+# bundle stage (once per version and language) and by the manifest stage.
+# They are parsed once per run and cached here, keyed by path; a cached
+# value is reloaded when the file's mtime or size changes, e.g. after an
+# object is re-tiled.
+
+_FILE_CACHE = {}
+
+
+def _cached_load(path, loader):
+    """
+    Return loader(path), reusing the previous result while the file is unchanged.
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = str(path)
+    cached = _FILE_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    value = loader(path)
+    _FILE_CACHE[key] = (stamp, value)
+    return value
+
+
+def _load_iiif_objects(csv_path):
+    objects = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in read_csv_rows(f):
+            object_id = row.get('object_id', '').strip()
+            if object_id:
+                objects.append({
+                    'object_id': object_id,
+                    'source_image': row.get('source_image', '').strip(),
+                    'title_en': row.get('title_en', '').strip(),
+                    'title_es': row.get('title_es', '').strip(),
+                    'description_en': row.get('description_en', '').strip(),
+                    'description_es': row.get('description_es', '').strip(),
+                    'creator_en': row.get('creator_en', '').strip(),
+                    'creator_es': row.get('creator_es', '').strip(),
+                    'date_en': row.get('date_en', '').strip(),
+                    'date_es': row.get('date_es', '').strip(),
+                    'attribution_en': row.get('attribution_en', '').strip(),
+                    'attribution_es': row.get('attribution_es', '').strip(),
+                    'rights': row.get('rights', '').strip()
+                })
+    return tuple(objects)
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iiif_catalog():
+    """
+    Return the rows of iiif/all-demo-objects.csv (cached for the run).
+
+    Callers must not modify the returned row dicts.
+
+    Raises FileNotFoundError if the CSV does not exist.
+    """
+    return _cached_load(IIIF_DIR / "all-demo-objects.csv", _load_iiif_objects)
+
+
+def get_self_hosted_object_ids():
+    """Get set of object_ids that have self-hosted IIIF tiles"""
+    try:
+        return {obj['object_id'] for obj in iiif_catalog()}
+    except Exception:
+        return set()
+
+
+def read_iiif_info(object_id):
+    """
+    Return the parsed info.json of a self-hosted object (cached for the run).
+
+    Returns None if the object has no info.json; raises if it cannot be
+    parsed. Callers must not modify the returned dict.
+    """
+    try:
+        return _cached_load(IIIF_DIR / "objects" / object_id / "info.json", _load_json)
+    except FileNotFoundError:
+        return None
+
+
+def iiif_manifest_url(base_url, object_id):
+    """Public URL of a self-hosted object's manifest.json."""
+    return f"{base_url}/iiif/objects/{object_id}/manifest.json"
+
+
+def preload_iiif_catalog():
+    """Load the object registry and every info.json into the cache.
+
+    Returns:
+        Dict of the cache entries, for seed_iiif_catalog() in worker
+        processes. Workers only share the parent's memory under the fork
+        start method; spawn (the macOS default) and forkserver start with
+        an empty cache, so the entries are passed to them explicitly.
+    """
+    for object_id in get_self_hosted_object_ids():
+        try:
+            read_iiif_info(object_id)
+        except Exception:
+            pass  # Reported by the stage that needs it
+    return dict(_FILE_CACHE)
+
+
+def seed_iiif_catalog(entries):
+    """Worker initializer: fill the cache with preload_iiif_catalog() entries."""
+    _FILE_CACHE.update(entries)
 
 
 # =============================================================================
@@ -162,42 +464,74 @@ def strip_yaml_frontmatter(content):
     return '\n'.join(lines[end_index + 1:]).strip()
 
 
+class GlossaryLinker:
+    """
+    Rewrites [[term_id|display]] and [[term_id]] into glossary link HTML.
+
+    Built once per term map: the pattern is compiled once for all
+    instances, and the link for each known term's bare [[term_id]] form
+    is prepared up front, so rewriting a text is a single re.sub pass
+    with dictionary lookups. Titles and display texts are inserted as-is,
+    as in v0.9.0.
+    """
+
+    # [[term_id]] or [[term_id|display]]; surrounding spaces are stripped
+    # from the groups afterwards, which avoids backtracking on lazy
+    # quantifiers and matches the same links as the v0.9.0 pattern
+    PATTERN = re.compile(r'\[\[([^|\]]+)(?:\|([^|\]]+))?\]\]')
+
+    def __init__(self, glossary_terms):
+        """
+        Args:
+            glossary_terms: Dictionary mapping term_id to term title
+        """
+        self.glossary_terms = glossary_terms or {}
+        self._bare_links = {
+            term_id: self._link(term_id, title)
+            for term_id, title in self.glossary_terms.items()
+        }
+
+    @staticmethod
+    def _link(term_id, display_text):
+        return f'<a href="#" class="glossary-inline-link" data-term-id="{term_id}">{display_text}</a>'
+
+    def _replace(self, match):
+        term_id = match.group(1).strip()
+        if match.group(2):  # [[term_id|display]]
+            return self._link(term_id, match.group(2).strip())
+        # Unknown terms still get a link (may be valid in consuming site)
+        return self._bare_links.get(term_id) or self._link(term_id, term_id)
+
+    def link(self, text):
+        """Return text with glossary links transformed to HTML."""
+        if not text or not self.glossary_terms or '[[' not in text:
+            return text
+        return self.PATTERN.sub(self._replace, text)
+
+    def link_all(self, texts):
+        """Generator calling link() on each text of an iterable."""
+        for text in texts:
+            yield self.link(text)
+
+
 def process_glossary_links(text, glossary_terms):
     """
     Transform [[term_id|display]] or [[term_id]] syntax into glossary link HTML.
 
     Args:
         text: HTML text to process (already converted from markdown)
-        glossary_terms: Dictionary mapping term_id to term title
+        glossary_terms: Dictionary mapping term_id to term title, or a
+                        GlossaryLinker built from one (reuse a linker when
+                        processing many texts with the same glossary)
 
     Returns:
         str: Text with glossary links transformed to HTML
     """
     if not text or not glossary_terms:
         return text
-
-    # Pattern: [[display|term]] or [[term]] with flexible spacing
-    pattern = r'\[\[\s*([^|\]]+?)(?:\s*\|\s*([^|\]]+?))?\s*\]\]'
-
-    def replace_glossary_link(match):
-        # If pipe is present: [[term_id|display]], else [[term_id]]
-        if match.group(2):  # Has pipe
-            term_id = match.group(1).strip()
-            display_text = match.group(2).strip()
-        else:  # No pipe
-            term_id = match.group(1).strip()
-            # Use glossary title as display text
-            display_text = glossary_terms.get(term_id, term_id)
-
-        # Check if term exists in glossary
-        if term_id in glossary_terms:
-            # Valid term - create link
-            return f'<a href="#" class="glossary-inline-link" data-term-id="{term_id}">{display_text}</a>'
-        else:
-            # Unknown term - still create link (may be valid in consuming site)
-            return f'<a href="#" class="glossary-inline-link" data-term-id="{term_id}">{display_text}</a>'
-
-    return re.sub(pattern, replace_glossary_link, text)
+    if not isinstance(glossary_terms, GlossaryLinker):
+        glossary_terms = GlossaryLinker(glossary_terms)
+    return glossary_terms.link(text)
 
 
 def convert_markdown_to_html(content, glossary_terms=None):
@@ -206,7 +540,8 @@ def convert_markdown_to_html(content, glossary_terms=None):
 
     Args:
         content: Raw markdown content
-        glossary_terms: Optional dictionary of glossary terms for link processing
+        glossary_terms: Optional dictionary of glossary terms (or a
+                        GlossaryLinker) for link processing
 
     Returns:
         str: HTML content with processed glossary links
@@ -221,7 +556,7 @@ def convert_markdown_to_html(content, glossary_terms=None):
         return content
 
     # Convert markdown to HTML using same extensions as Telar
-    html = markdown.markdown(content, extensions=['extra', 'nl2br'])
+    html = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
 
     # Process glossary links
     if glossary_terms:
@@ -230,14 +565,109 @@ def convert_markdown_to_html(content, glossary_terms=None):
     return html
 
 
+def html_renderer():
+    """Markdown renderer in use, e.g. "markdown 3.7", or "none" if not installed."""
+    return f"markdown {markdown.__version__}" if MARKDOWN_AVAILABLE else "none"
+
+
+def _html_cache_salt(glossary_terms):
+    """
+    Cache key component shared by every render with the same settings:
+    the markdown package version, its extension set and the glossary
+    term map.
+    """
+    return _sha256_json({
+        "renderer": html_renderer(),
+        "extensions": MARKDOWN_EXTENSIONS,
+        "glossary_terms": glossary_terms or {},
+    })
+
+
+def render_markdown_cached(content, glossary_terms, salt, stats=None):
+    """
+    convert_markdown_to_html() with a persistent on-disk cache.
+
+    Renders are stored in HTML_CACHE_DIR, keyed on the SHA-256 of the
+    content plus salt (see _html_cache_salt()), so unchanged texts are
+    never re-rendered across runs. Cache files are written atomically,
+    so concurrent workers can share the cache.
+
+    Args:
+        content: Raw markdown
+        glossary_terms: Dictionary of term_id -> title (or a GlossaryLinker)
+                        for glossary links
+        salt: Value from _html_cache_salt() for the same term map
+        stats: Optional dict; its 'rendered' or 'cached' count is incremented
+    """
+    key = hashlib.sha256(f"{salt}\n{content}".encode('utf-8')).hexdigest()
+    cache_path = HTML_CACHE_DIR / key[:2] / f"{key}.html"
+
+    if cache_path.exists():
+        try:
+            html = cache_path.read_text(encoding='utf-8')
+            if stats is not None:
+                stats['cached'] = stats.get('cached', 0) + 1
+            return html
+        except OSError:
+            pass
+
+    html = convert_markdown_to_html(content, glossary_terms)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"  Warning: Could not write HTML cache entry: {e}")
+    if stats is not None:
+        stats['rendered'] = stats.get('rendered', 0) + 1
+    return html
+
+
+def render_bundle_html(bundle):
+    """
+    Add pre-rendered HTML next to the raw markdown of a bundle.
+
+    Each layer and glossary entry with "content" gets "content_html",
+    rendered with glossary links resolved against the bundle's glossary
+    (see render_markdown_cached()).
+
+    Returns:
+        Dict with 'rendered' and 'cached' counts
+
+    Raises:
+        RuntimeError: If the markdown package is not installed; the raw
+                      markdown must never be published as content_html
+    """
+    if not MARKDOWN_AVAILABLE:
+        raise RuntimeError("rendering HTML requires the markdown package")
+    glossary_terms = {term_id: data['term'] for term_id, data in bundle.get("glossary", {}).items()}
+    salt = _html_cache_salt(glossary_terms)
+    linker = GlossaryLinker(glossary_terms)
+    stats = {'rendered': 0, 'cached': 0}
+
+    for story in bundle.get("stories", {}).values():
+        for step in story.get("steps", []):
+            for layer in step.get("layers", {}).values():
+                if layer.get("content"):
+                    layer["content_html"] = render_markdown_cached(
+                        layer["content"], linker, salt, stats)
+
+    for entry in bundle.get("glossary", {}).values():
+        if entry.get("content"):
+            entry["content_html"] = render_markdown_cached(
+                entry["content"], linker, salt, stats)
+
+    return stats
+
+
 def read_project_csv(csv_path):
     """Read demo-project.csv (or proyecto.csv) and return list of project entries."""
     projects = []
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row = normalize_row(row)
+            for row in read_csv_rows(f):
                 order = row.get('order', '').strip()
                 story_id = row.get('story_id', '').strip()
                 title = row.get('title', '').strip()
@@ -270,28 +700,25 @@ def read_project_csv(csv_path):
     return projects
 
 
-def get_self_hosted_object_ids():
-    """Get set of object_ids that have self-hosted IIIF tiles"""
-    csv_path = IIIF_DIR / "all-demo-objects.csv"
-    object_ids = set()
-
-    if not csv_path.exists():
-        return object_ids
-
-    try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                object_id = row.get('object_id', '').strip()
-                if object_id:
-                    object_ids.add(object_id)
-    except Exception:
-        pass
+def pick_thumbnail_size(sizes, target_width=None):
+    """
+    Choose the info.json size to use as a thumbnail.
 
-    return object_ids
+    Returns the smallest size at least target_width wide, or the largest
+    size if none is wide enough (None if sizes is empty).
+    """
+    if not sizes:
+        return None
+    if target_width is None:
+        target_width = DEFAULT_THUMBNAIL_WIDTH
+    by_width = sorted(sizes, key=lambda size: size['width'])
+    for size in by_width:
+        if size['width'] >= target_width:
+            return size
+    return by_width[-1]
 
 
-def read_objects_csv(csv_path, base_url):
+def read_objects_csv(csv_path, base_url, thumbnail_width=None, deps=None):
     """
     Read demo-objects.csv and return dict of objects keyed by object_id.
 
@@ -300,16 +727,21 @@ def read_objects_csv(csv_path, base_url):
     field from v0.6.0 CSVs is mapped to 'source' in the bundle so that all
     bundles use a consistent field name.
 
-    Auto-populates source_url for self-hosted IIIF objects.
+    Auto-populates source_url for self-hosted IIIF objects, and a thumbnail
+    from the info.json size closest to thumbnail_width (see
+    pick_thumbnail_size()).
+
+    If deps is a set, the IIIF files consulted (all-demo-objects.csv and
+    each info.json, present or not) are added to it.
     """
     objects = {}
     self_hosted = get_self_hosted_object_ids()
+    if deps is not None:
+        deps.add(IIIF_DIR / "all-demo-objects.csv")
 
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row = normalize_row(row)
+            for row in read_csv_rows(f):
                 object_id = row.get('object_id', '').strip()
                 # Skip empty rows and comment/helper rows
                 if not object_id or object_id.startswith('#'):
@@ -329,7 +761,7 @@ def read_objects_csv(csv_path, base_url):
                     if value:
                         obj[field] = value
 
-                # 'source' (v0.8.0) — normalize_row handles location/ubicacion aliases
+                # 'source' (v0.8.0) — compile_header handles location/ubicacion aliases
                 source_value = row.get('source', '').strip()
                 if source_value:
                     obj['source'] = source_value
@@ -337,22 +769,19 @@ def read_objects_csv(csv_path, base_url):
                 # Auto-populate source_url and thumbnail for self-hosted objects
                 if object_id in self_hosted:
                     if not obj.get('source_url'):
-                        obj['source_url'] = f"{base_url}/iiif/objects/{object_id}/manifest.json"
+                        obj['source_url'] = iiif_manifest_url(base_url, object_id)
 
                     # Auto-populate thumbnail from info.json sizes
                     if not obj.get('thumbnail'):
-                        info_path = IIIF_DIR / "objects" / object_id / "info.json"
-                        if info_path.exists():
-                            try:
-                                with open(info_path, 'r') as f:
-                                    info = json.load(f)
-                                sizes = info.get('sizes', [])
-                                if sizes:
-                                    # Use largest available size (first in array)
-                                    largest = sizes[0]
-                                    obj['thumbnail'] = f"{base_url}/iiif/objects/{object_id}/full/{largest['width']},{largest['height']}/0/default.jpg"
-                            except Exception as e:
-                                print(f"  Warning: Could not read info.json for {object_id}: {e}")
+                        if deps is not None:
+                            deps.add(IIIF_DIR / "objects" / object_id / "info.json")
+                        try:
+                            info = read_iiif_info(object_id)
+                            size = pick_thumbnail_size(info.get('sizes', []), thumbnail_width) if info else None
+                            if size:
+                                obj['thumbnail'] = f"{base_url}/iiif/objects/{object_id}/full/{size['width']},{size['height']}/0/default.jpg"
+                        except Exception as e:
+                            print(f"  Warning: Could not read info.json for {object_id}: {e}")
 
                 objects[object_id] = obj
     except FileNotFoundError:
@@ -364,7 +793,7 @@ def read_objects_csv(csv_path, base_url):
     return objects
 
 
-def read_story_csv(csv_path, texts_dir, glossary_terms=None):
+def read_story_csv(csv_path, texts_dir, glossary_terms=None, deps=None):
     """
     Read a story CSV and return list of steps with embedded layer content.
 
@@ -377,6 +806,7 @@ def read_story_csv(csv_path, texts_dir, glossary_terms=None):
         texts_dir: Path to the texts/stories/ directory; .md values
                    include the story subdirectory (e.g. paisajes/file.md)
         glossary_terms: Optional dictionary of term_id -> title for glossary link processing
+        deps: Optional set; every referenced .md path (found or missing) is added to it
 
     Returns:
         List of step dicts with layers containing raw markdown content
@@ -384,9 +814,7 @@ def read_story_csv(csv_path, texts_dir, glossary_terms=None):
     steps = []
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row = normalize_row(row)
+            for row in read_csv_rows(f):
                 step_num = row.get('step', '').strip()
                 # Skip empty rows and comment/helper rows
                 if not step_num or step_num.startswith('#'):
@@ -417,7 +845,7 @@ def read_story_csv(csv_path, texts_dir, glossary_terms=None):
                 # Supports two formats (consistent with Telar main CSV format):
                 #   layer{i}_content with a .md path: file reference relative to texts_dir
                 #   layer{i}_content with other text: inline markdown content
-                # normalize_row maps layer{i}_file -> layer{i}_content, so both
+                # compile_header maps layer{i}_file -> layer{i}_content, so both
                 # column names are unified before we get here.
                 layers = {}
                 for i in [1, 2]:
@@ -428,6 +856,8 @@ def read_story_csv(csv_path, texts_dir, glossary_terms=None):
                         if cell_value.endswith('.md'):
                             # File reference — read the markdown file
                             md_path = texts_dir / cell_value
+                            if deps is not None:
+                                deps.add(md_path)
                             content = ""
                             if md_path.exists():
                                 with open(md_path, 'r', encoding='utf-8') as md_file:
@@ -460,19 +890,25 @@ def read_story_csv(csv_path, texts_dir, glossary_terms=None):
     return steps
 
 
-def read_glossary_files(glossary_dir):
+def read_glossary_files(glossary_dir, deps=None):
     """
     Read all glossary markdown files and return dict keyed by term slug.
 
     Glossary files have YAML front matter with term_id and title,
-    followed by markdown content.
+    followed by markdown content. If deps is a set, the directory and
+    each file read are added to it.
     """
     glossary = {}
 
+    if deps is not None:
+        deps.add(glossary_dir)
+
     if not glossary_dir.exists():
         return glossary
 
     for md_file in sorted(glossary_dir.glob("*.md")):
+        if deps is not None:
+            deps.add(md_file)
         try:
             with open(md_file, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -522,9 +958,7 @@ def read_glossary_csv(csv_path):
 
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row = normalize_row(row)
+            for row in read_csv_rows(f):
                 term_id = row.get('term_id', '').strip()
                 # Skip comment/helper rows
                 if not term_id or term_id.startswith('#'):
@@ -548,7 +982,7 @@ def read_glossary_csv(csv_path):
     return glossary
 
 
-def generate_bundle(version, lang, lang_dir, base_url):
+def generate_bundle(version, lang, lang_dir, base_url, thumbnail_width=None, deps=None):
     """
     Generate a complete telar-demo-bundle.json for a single language.
 
@@ -557,6 +991,9 @@ def generate_bundle(version, lang, lang_dir, base_url):
         lang: Language code (e.g., "en", "es")
         lang_dir: Path to the language directory
         base_url: Base URL for IIIF content
+        thumbnail_width: Target thumbnail width for self-hosted objects
+        deps: Optional set that collects every input path the bundle depends
+              on, including candidate paths that were looked for but missing
 
     Returns:
         Tuple of (bundle_dict, warnings_list)
@@ -583,8 +1020,12 @@ def generate_bundle(version, lang, lang_dir, base_url):
 
     print(f"\nProcessing language: {lang}")
 
+    if deps is None:
+        deps = set()
+
     # Read project CSV
     project_csv = lang_dir / "demo-project.csv"
+    deps.add(project_csv)
     if project_csv.exists():
         projects = read_project_csv(project_csv)
         if projects:
@@ -595,8 +1036,9 @@ def generate_bundle(version, lang, lang_dir, base_url):
 
     # Read objects CSV
     objects_csv = lang_dir / "demo-objects.csv"
+    deps.add(objects_csv)
     if objects_csv.exists():
-        objects = read_objects_csv(objects_csv, base_url)
+        objects = read_objects_csv(objects_csv, base_url, thumbnail_width, deps)
         if objects:
             bundle["objects"] = objects
             print(f"  Found {len(objects)} objects")
@@ -610,6 +1052,7 @@ def generate_bundle(version, lang, lang_dir, base_url):
     if not glossary_csv.exists():
         glossary_csv = lang_dir / "glosario.csv"  # bilingual fallback (v0.6.0+)
     glossary_dir = lang_dir / "texts" / "glossary"
+    deps.update([lang_dir / "glossary.csv", lang_dir / "glosario.csv"])
     glossary = {}
     glossary_terms = {}  # term_id -> title mapping for link processing
 
@@ -622,16 +1065,18 @@ def generate_bundle(version, lang, lang_dir, base_url):
         else:
             warnings.append(f"[{lang}] glossary.csv exists but produced no entries")
     elif glossary_dir.exists():
-        glossary = read_glossary_files(glossary_dir)
+        glossary = read_glossary_files(glossary_dir, deps)
         if glossary:
             bundle["glossary"] = glossary
             glossary_terms = {term_id: data['term'] for term_id, data in glossary.items()}
             print(f"  Found {len(glossary)} glossary entries (from texts/glossary/)")
     else:
+        deps.add(glossary_dir)
         warnings.append(f"[{lang}] No glossary found (checked glossary.csv and texts/glossary/)")
 
     # Read stories (with glossary terms for link processing)
     texts_stories_dir = lang_dir / "texts" / "stories"
+    deps.add(texts_stories_dir)
     if not texts_stories_dir.exists():
         warnings.append(f"[{lang}] Missing texts/stories/ directory")
     else:
@@ -640,6 +1085,7 @@ def generate_bundle(version, lang, lang_dir, base_url):
 
             # Find story CSV
             story_csv = lang_dir / f"{story_id}.csv"
+            deps.add(story_csv)
             if not story_csv.exists():
                 warnings.append(f"[{lang}] Missing {story_id}.csv")
                 continue
@@ -648,7 +1094,7 @@ def generate_bundle(version, lang, lang_dir, base_url):
             # texts_stories_dir is the texts/stories/ directory;
             # .md cell values include the story subdirectory
             # (e.g. paisajes/proceso_legal.md), matching stories.py
-            steps = read_story_csv(story_csv, texts_stories_dir, glossary_terms)
+            steps = read_story_csv(story_csv, texts_stories_dir, glossary_terms, deps)
             if steps:
                 bundle["stories"][story_id] = {"steps": steps}
                 print(f"  Story '{story_id}': {len(steps)} steps")
@@ -656,282 +1102,1242 @@ def generate_bundle(version, lang, lang_dir, base_url):
     return bundle, warnings
 
 
-def validate_bundle(bundle, lang):
+# Compiled bundle schema validator, built once per process (see _bundle_validator())
+_BUNDLE_VALIDATOR = None
+
+
+def _bundle_validator():
     """
-    Validate generated bundle for common CSV parsing issues.
+    Return a validator for schemas/telar_bundle_<BUNDLE_FORMAT_VERSION>.json.
 
-    Returns list of validation warnings.
+    The schema is read and compiled on first use and reused for every
+    language and version. Returns None if jsonschema is not installed or
+    the schema is missing (schema checks are then skipped; referential
+    checks still run).
     """
-    warnings = []
+    global _BUNDLE_VALIDATOR
+    if _BUNDLE_VALIDATOR is not None:
+        return _BUNDLE_VALIDATOR or None
 
-    # Patterns that suggest CSV parsing errors (field got shifted)
-    suspicious_bylines = ['navigation', 'glossary', 'widgets', 'linking']
-    suspicious_buttons = ['md', '.md', 'true', 'false']
-
-    # Validate project entries
-    for proj in bundle.get("project", []):
-        project_id = proj.get("project_id", "unknown")
-
-        # Check for suspiciously short subtitle (might be truncated)
-        subtitle = proj.get("subtitle", "")
-        if subtitle and len(subtitle) < 20 and ',' not in subtitle:
-            # Short subtitle without commas might be truncated
-            byline = proj.get("byline", "")
-            if byline.lower() in suspicious_bylines:
-                warnings.append(
-                    f"[{lang}] CSV PARSE ERROR in project '{project_id}': "
-                    f"byline='{byline}' looks like part of subtitle. "
-                    f"Check if subtitle field needs quotes."
-                )
-
-        # Check byline format
-        byline = proj.get("byline", "")
-        if byline and not byline.startswith("by") and byline.lower() in suspicious_bylines:
-            warnings.append(
-                f"[{lang}] CSV PARSE ERROR in project '{project_id}': "
-                f"byline='{byline}' looks like part of subtitle got shifted. "
-                f"Add quotes around subtitle field in demo-project.csv"
-            )
+    _BUNDLE_VALIDATOR = False
+    try:
+        import jsonschema
+    except ImportError:
+        return None
 
-    # Validate stories
-    for story_id, story in bundle.get("stories", {}).items():
-        for step in story.get("steps", []):
-            step_num = step.get("step", "?")
+    schema_path = SCRIPT_DIR / "schemas" / f"telar_bundle_{BUNDLE_FORMAT_VERSION.replace('.', '_')}.json"
+    if not schema_path.exists():
+        print(f"  Warning: Bundle schema not found at {schema_path}")
+        return None
 
-            # Check for empty layer content when button is defined
-            for layer_key in ["layer1", "layer2"]:
-                layer = step.get("layers", {}).get(layer_key, {})
-                if layer:
-                    button = layer.get("button", "")
-                    content = layer.get("content", "")
-
-                    if button and not content:
-                        warnings.append(
-                            f"[{lang}] Empty layer content in '{story_id}' step {step_num}: "
-                            f"button='{button}' but no content loaded"
-                        )
-
-                    # Check for suspicious button names (might be file extension)
-                    if button.lower() in suspicious_buttons or button.endswith('.md'):
-                        warnings.append(
-                            f"[{lang}] CSV PARSE ERROR in '{story_id}' step {step_num}: "
-                            f"button='{button}' looks like a filename. "
-                            f"Check if answer field needs quotes."
-                        )
-
-            # Check for suspiciously short answers that might be truncated
-            answer = step.get("answer", "")
-            if answer and len(answer) < 30:
-                # Very short answers after a question might indicate truncation
-                question = step.get("question", "")
-                if question and len(question) > len(answer) * 2:
-                    # Question much longer than answer is suspicious
-                    pass  # Could add warning but might have false positives
-
-    # Validate objects
-    for obj_id, obj in bundle.get("objects", {}).items():
-        # Check for missing source_url
-        if not obj.get("source_url"):
-            warnings.append(
-                f"[{lang}] Object '{obj_id}' missing source_url"
-            )
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        _BUNDLE_VALIDATOR = jsonschema.Draft7Validator(json.load(f))
+    return _BUNDLE_VALIDATOR
 
-    return warnings
 
+def _issue(code, path, message):
+    return {"code": code, "path": '/'.join(str(part) for part in path), "message": message}
 
-def generate_bundles_for_version(version, base_url=None):
-    """
-    Generate telar-demo-bundle.json for all languages in a version.
 
-    Args:
-        version: Telar version string (e.g., "0.6.0")
-        base_url: Base URL for IIIF content
+# Values a shifted CSV field leaves behind: a byline that is really the end
+# of the subtitle, a layer button that is really a file name or flag
+SUSPICIOUS_BYLINES = ('navigation', 'glossary', 'widgets', 'linking')
+SUSPICIOUS_BUTTONS = ('md', '.md', 'true', 'false')
 
-    Returns:
-        Tuple of (success_bool, all_warnings_list)
-    """
-    if not base_url:
-        base_url = DEFAULT_BASE_URL
+# Inline code spans and fenced blocks; [[term]] inside them is prose, not a link
+CODE_SPAN_PATTERN = re.compile(r'```.*?```|`[^`\n]*`', re.DOTALL)
 
-    version_dir = DEMOS_DIR / f"v{version}"
 
-    if not version_dir.exists():
-        print(f"Error: Version directory does not exist: {version_dir}")
-        sys.exit(1)
+def check_bundle(bundle, schema=False):
+    """
+    Check a bundle for CSV parsing problems and broken references.
 
-    all_warnings = []
-    bundles_generated = 0
+    One indexed pass over the bundle reports bylines and layer buttons
+    that look like a field shifted by an unquoted comma (code
+    "csv-split"), empty layer contents ("empty-layer"), objects without
+    source_url ("missing-source-url"), steps whose object is not in
+    objects ("unknown-object") and [[term]] links to terms not in
+    glossary ("unknown-term"); links inside code spans are ignored.
 
-    # Scan each language directory
-    for lang_dir in sorted(version_dir.iterdir()):
-        if not lang_dir.is_dir() or lang_dir.name.startswith('.'):
-            continue
-        # Skip non-language directories
-        if lang_dir.name in ['manifest.json', 'telar-demo-bundle.json']:
-            continue
+    With schema=True the bundle is also checked against its JSON schema
+    (code "schema"), which covers required fields and types. This is
+    much slower than the indexed pass, so it is opt-in (--schema-check).
 
-        lang = lang_dir.name
+    Returns:
+        List of issue dicts with "code", "path" (slash-separated JSON
+        path, e.g. "stories/paisajes/steps/0/object") and "message"
+    """
+    issues = []
+
+    if schema:
+        validator = _bundle_validator()
+        if validator is not None:
+            for err in sorted(validator.iter_errors(bundle), key=lambda e: [str(p) for p in e.absolute_path]):
+                issues.append(_issue("schema", err.absolute_path, err.message))
+
+    objects = bundle.get("objects", {})
+    glossary = bundle.get("glossary", {})
+    texts = bundle.get("texts", {})
+
+    def unknown_terms(text):
+        """Term ids linked from text that are not in glossary, in text order."""
+        if not text or '[[' not in text:
+            return ()
+        if '`' in text:
+            text = CODE_SPAN_PATTERN.sub('', text)
+        links = GlossaryLinker.PATTERN.findall(text)
+        if all(term_id in glossary for term_id, _display in links):
+            return ()
+        # Groups keep surrounding spaces (see GlossaryLinker.PATTERN)
+        return [term_id for term_id in dict.fromkeys(term_id.strip() for term_id, _display in links)
+                if term_id not in glossary]
+
+    def report_unknown_terms(term_ids, path, where):
+        for term_id in term_ids:
+            issues.append(_issue("unknown-term", path,
+                                 f"{where} links to glossary term '{term_id}', "
+                                 f"which is not in glossary"))
+
+    for i, proj in enumerate(bundle.get("project", [])):
+        byline = proj.get("byline", "")
+        if byline.strip().lower() in SUSPICIOUS_BYLINES:
+            issues.append(_issue("csv-split", ["project", i, "byline"],
+                                 f"CSV PARSE ERROR in project '{proj.get('story_id', '?')}': "
+                                 f"byline='{byline}' looks like part of the subtitle. "
+                                 f"Add quotes around the subtitle field in demo-project.csv"))
 
-        # Generate bundle for this language
-        bundle, warnings = generate_bundle(version, lang, lang_dir, base_url)
-        all_warnings.extend(warnings)
+    for object_id, obj in objects.items():
+        if not obj.get("source_url"):
+            issues.append(_issue("missing-source-url", ["objects", object_id],
+                                 f"Object '{object_id}' missing source_url"))
 
-        # Validate bundle for common issues
-        validation_warnings = validate_bundle(bundle, lang)
-        all_warnings.extend(validation_warnings)
+    for story_id, story in bundle.get("stories", {}).items():
+        for i, step in enumerate(story.get("steps", [])):
+            step_num = step.get("step", "?")
+            path = ("stories", story_id, "steps", i)
+            object_id = step.get("object")
+            if object_id and object_id not in objects:
+                issues.append(_issue("unknown-object", path + ("object",),
+                                     f"'{story_id}' step {step_num} uses object '{object_id}', "
+                                     f"which is not in objects"))
+            for layer_key, layer in step.get("layers", {}).items():
+                button = layer.get("button", "")
+                content = layer.get("content") or texts.get(layer.get("content_ref"), '')
+                if button and not content:
+                    issues.append(_issue("empty-layer", path + ("layers", layer_key),
+                                         f"Empty layer content in '{story_id}' step {step_num}: "
+                                         f"button='{button}' but no content loaded"))
+                if button.lower() in SUSPICIOUS_BUTTONS or button.endswith('.md'):
+                    issues.append(_issue("csv-split", path + ("layers", layer_key),
+                                         f"CSV PARSE ERROR in '{story_id}' step {step_num}: "
+                                         f"button='{button}' looks like a filename. "
+                                         f"Check if answer field needs quotes."))
+                missing = unknown_terms(content)
+                if missing:
+                    report_unknown_terms(missing, path + ("layers", layer_key),
+                                         f"'{story_id}' step {step_num} ({layer_key}, button='{button}')")
+
+    for term_id, entry in glossary.items():
+        missing = unknown_terms(entry.get("content"))
+        if missing:
+            report_unknown_terms(missing, ["glossary", term_id], f"Glossary entry '{term_id}'")
+
+    return issues
+
+
+def format_bundle_issue(issue, lang):
+    """One-line description of a check_bundle() issue for the warnings report.
+
+    Schema errors are prefixed with their JSON path; the other issues
+    name the story, step and button in their message.
+    """
+    if issue['code'] == 'schema':
+        return f"[{lang}] {issue['path'] or '(bundle)'}: {issue['message']}"
+    return f"[{lang}] {issue['message']}"
 
-        # Check if bundle has content
-        if not bundle["project"] and not bundle["objects"]:
-            all_warnings.append(f"[{lang}] No content found, skipping language")
-            continue
 
-        # Write bundle file
-        bundle_path = lang_dir / "telar-demo-bundle.json"
-        with open(bundle_path, 'w', encoding='utf-8') as f:
-            json.dump(bundle, f, indent=2, ensure_ascii=False)
+def validate_bundle(bundle, lang, schema=False):
+    """
+    Validate a generated bundle (see check_bundle()).
 
-        print(f"  Written: {bundle_path}")
-        bundles_generated += 1
+    Returns list of validation warnings.
+    """
+    return [format_bundle_issue(issue, lang) for issue in check_bundle(bundle, schema)]
 
-    return bundles_generated > 0, all_warnings
 
+def _state_key(path):
+    """Build-state key for an input path: repo-relative where possible."""
+    try:
+        return Path(path).relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
 
-# =============================================================================
-# IIIF GENERATION
-# =============================================================================
 
-def _detect_tile_backend():
-    """Detect available IIIF tile generation backend.
+def _dependency_hash(path):
+    """
+    Hash one bundle input.
 
-    Prefers libvips (faster) over the Python iiif library.
-    Returns 'libvips', 'iiif', or None.
+    Files hash their contents and directories their sorted entry names;
+    a missing path hashes to None, so creating it counts as a change.
     """
-    if shutil.which('vips'):
-        return 'libvips'
-    try:
-        from iiif.static import IIIFStatic
-        return 'iiif'
-    except ImportError:
-        return None
+    if path.is_file():
+        return _sha256_file(path)
+    if path.is_dir():
+        names = sorted(child.name for child in path.iterdir())
+        return hashlib.sha256('\n'.join(names).encode('utf-8')).hexdigest()
+    return None
 
 
-def check_iiif_dependencies():
-    """Check if required dependencies for IIIF generation are installed.
+def load_bundle_build_state():
+    """
+    Read demos/build-state.json.
 
     Returns:
-        Backend name ('libvips' or 'iiif') if ready, None if not.
+        Dict mapping "v<version>/<lang>" to its recorded inputs (empty if
+        the file is missing or unreadable)
     """
+    if not BUNDLE_BUILD_STATE_PATH.exists():
+        return {}
     try:
-        from PIL import Image, ImageOps
-    except ImportError:
-        print("Missing required dependency: Pillow")
-        print("  pip install Pillow")
-        return None
+        with open(BUNDLE_BUILD_STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read {BUNDLE_BUILD_STATE_PATH}: {e}")
+        return {}
+    return state.get('bundles', {})
 
-    backend = _detect_tile_backend()
-    if backend is None:
-        print("No IIIF tile generation backend found!")
-        print("\nInstall one of:")
-        print("  libvips (recommended): brew install vips  (macOS)")
-        print("                         sudo apt-get install libvips-dev  (Linux)")
-        print("  Python iiif library:   pip install iiif")
-        return None
 
-    return backend
+def save_bundle_build_state(bundles_state):
+    """Write demos/build-state.json with one entry per version/language."""
+    state = {
+        "generator": GENERATOR_VERSION,
+        "bundles": {key: bundles_state[key] for key in sorted(bundles_state)},
+    }
+    with open(BUNDLE_BUILD_STATE_PATH, 'w', encoding='utf-8') as f:
+        dump_json(state, f)
+        f.write('\n')
 
 
-def read_iiif_objects_csv():
-    """Read iiif/all-demo-objects.csv and return list of objects with multilingual metadata"""
-    csv_path = IIIF_DIR / "all-demo-objects.csv"
-    objects = []
+# Build settings recorded in each demos/build-state.json entry
+BUNDLE_SETTING_KEYS = ('generator', 'base_url', 'thumbnail_width', 'reproducible',
+                       'source_date_epoch', 'dedupe_texts', 'render_html', 'html_renderer',
+                       'schema_check')
 
-    if not csv_path.exists():
-        print(f"Error: {csv_path} not found")
-        return None
 
-    try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                object_id = row.get('object_id', '').strip()
-                if object_id:
-                    objects.append({
-                        'object_id': object_id,
-                        'source_image': row.get('source_image', '').strip(),
-                        'title_en': row.get('title_en', '').strip(),
-                        'title_es': row.get('title_es', '').strip(),
-                        'description_en': row.get('description_en', '').strip(),
-                        'description_es': row.get('description_es', '').strip(),
-                        'creator_en': row.get('creator_en', '').strip(),
-                        'creator_es': row.get('creator_es', '').strip(),
-                        'date_en': row.get('date_en', '').strip(),
-                        'date_es': row.get('date_es', '').strip(),
-                        'attribution_en': row.get('attribution_en', '').strip(),
-                        'attribution_es': row.get('attribution_es', '').strip(),
-                        'rights': row.get('rights', '').strip()
-                    })
-    except Exception as e:
-        print(f"Error reading {csv_path}: {e}")
-        return None
+def _bundle_up_to_date(previous, bundle_path, settings):
+    """True if the bundle on disk was built from exactly the current inputs."""
+    if not previous or not bundle_path.exists():
+        return False
+    if any(previous.get(key) != settings.get(key) for key in BUNDLE_SETTING_KEYS):
+        return False
+    if _sha256_file(bundle_path) != previous.get('bundle_sha256'):
+        return False  # Edited or replaced since it was written
+    return all(_dependency_hash(REPO_ROOT / key) == digest
+               for key, digest in previous.get('inputs', {}).items())
 
-    return objects
 
+def _without_timestamp(bundle):
+    meta = {key: value for key, value in bundle.get('_meta', {}).items() if key != 'generated'}
+    return {**bundle, '_meta': meta}
 
-def preprocess_image(image_path):
-    """Preprocess an image for IIIF tile generation.
 
-    Handles EXIF orientation, transparency removal, palette mode conversion,
-    and format conversion to JPEG. Both backends need a clean JPEG input.
+def _reproducible_timestamp(deps):
+    """
+    Timestamp for a reproducible bundle.
 
-    Returns:
+    Uses SOURCE_DATE_EPOCH if set (see reproducible-builds.org), otherwise
+    the newest modification time among the bundle's input files.
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch and epoch.isdigit():
+        seconds = int(epoch)
+    else:
+        if epoch:
+            print(f"  Warning: Ignoring invalid SOURCE_DATE_EPOCH '{epoch}'")
+        mtimes = [path.stat().st_mtime for path in deps if path.is_file()]
+        seconds = int(max(mtimes)) if mtimes else 0
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def dedupe_layer_texts(bundle):
+    """
+    Store each distinct layer body once in a content-addressed texts table.
+
+    Every non-empty layer "content" is moved to bundle["texts"], keyed by
+    the first 16 hex digits of its SHA-256, and replaced in the layer by
+    "content_ref" with that key. Rendered content is unchanged: a client
+    resolves texts[content_ref] to get the same markdown. Pre-rendered
+    "content_html" (see render_bundle_html()) is moved the same way to
+    "content_html_ref". Empty contents are left inline.
+
+    Returns:
+        Tuple of (layers_seen, texts_table_size)
+    """
+    texts = {}
+    layers_seen = 0
+    for story in bundle.get("stories", {}).values():
+        for step in story.get("steps", []):
+            for layer in step.get("layers", {}).values():
+                if not layer.get("content"):
+                    continue
+                layers_seen += 1
+                for field in ("content", "content_html"):
+                    text = layer.get(field)
+                    if not text:
+                        continue
+                    key = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+                    texts.setdefault(key, text)
+                    del layer[field]
+                    layer[f"{field}_ref"] = key
+    bundle["texts"] = texts
+    return layers_seen, len(texts)
+
+
+def make_reproducible(bundle, deps):
+    """
+    Fix a bundle's metadata so that identical inputs give identical bytes.
+
+    Replaces _meta.generated with _reproducible_timestamp() and records
+    _meta.content_hash, the SHA-256 of everything outside _meta. Key order
+    is made stable by writing the bundle with sort_keys=True.
+    """
+    content = {key: value for key, value in bundle.items() if key != '_meta'}
+    bundle['_meta']['generated'] = _reproducible_timestamp(deps)
+    bundle['_meta']['content_hash'] = f"sha256:{_sha256_json(content)}"
+    return bundle
+
+
+def _atomic_write(path, write, binary=False, skip_if_identical=False):
+    """
+    Write a file through a temporary file in the same directory.
+
+    write(f) is called with the open temporary file. Once it returns, the
+    file is flushed to disk and renamed over path, so readers (and the
+    static site) see either the old file or the complete new one, never a
+    truncated write. If write() raises, the temporary file is removed and
+    path is left as it was.
+
+    Args:
+        path: Destination Path
+        write: Callable taking the open file
+        binary: Open the temporary file in binary mode (text is UTF-8)
+        skip_if_identical: Keep path untouched if it already holds exactly
+            the bytes written
+
+    Returns:
+        True if path was replaced, False if skip_if_identical kept it
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if skip_if_identical and path.exists() and filecmp.cmp(temp_path, path, shallow=False):
+            os.unlink(temp_path)
+            return False
+        # mkstemp creates the file 0600; give it the permissions open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+    return True
+
+
+def _write_if_changed(path, data):
+    """Write bytes to path unless it already holds exactly these bytes."""
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    _atomic_write(path, lambda f: f.write(data), binary=True)
+    return True
+
+
+def iter_bundle_json(bundle, sort_keys=False):
+    """
+    Encode a bundle as JSON, one top-level entry at a time.
+
+    Yields the same text as dumps_json(bundle, sort_keys=sort_keys), but
+    top-level dicts and lists (stories, glossary, objects, texts, project)
+    are encoded entry by entry, so the encoded text of the whole bundle is
+    never held in memory at once. The bundle dict itself still is.
+    """
+    def encode(value, pad):
+        text = dumps_json(value, sort_keys=sort_keys)
+        # Encoded strings never contain a raw newline, so this only re-indents
+        return text.replace('\n', '\n' + pad)
+
+    def key_text(key):
+        return json.dumps(key, ensure_ascii=False)
+
+    keys = sorted(bundle) if sort_keys else list(bundle)
+    if not keys:
+        yield '{}'
+        return
+
+    yield '{'
+    for i, key in enumerate(keys):
+        value = bundle[key]
+        yield ('\n  ' if i == 0 else ',\n  ') + key_text(key) + ': '
+
+        if isinstance(value, list):
+            if not value:
+                yield '[]'
+                continue
+            yield '['
+            for j, item in enumerate(value):
+                yield ('\n    ' if j == 0 else ',\n    ') + encode(item, '    ')
+            yield '\n  ]'
+        elif isinstance(value, dict):
+            items = sorted(value.items()) if sort_keys else value.items()
+            empty = True
+            for entry_key, entry in items:
+                yield ('{\n    ' if empty else ',\n    ') + key_text(entry_key) + ': ' + encode(entry, '    ')
+                empty = False
+            yield '{}' if empty else '\n  }'
+        else:
+            yield encode(value, '  ')
+    yield '\n}'
+
+
+def write_bundle_json(bundle, bundle_path, sort_keys=False, skip_if_identical=False):
+    """
+    Stream a bundle to bundle_path and atomically replace the old file.
+
+    The bundle is encoded with iter_bundle_json() into a temporary file
+    next to bundle_path (see _atomic_write()), so an interrupted build
+    never leaves a truncated bundle behind.
+
+    Returns:
+        True if the file was written, False if skip_if_identical found it
+        already holding the same bytes
+    """
+    def write(f):
+        for chunk in iter_bundle_json(bundle, sort_keys=sort_keys):
+            f.write(chunk)
+
+    return _atomic_write(bundle_path, write, skip_if_identical=skip_if_identical)
+
+
+# Precompressed siblings written next to a bundle (see write_compressed_bundle())
+COMPRESSED_BUNDLE_SUFFIXES = ('.gz', '.br')
+
+
+def remove_compressed_bundle(bundle_path, suffixes=COMPRESSED_BUNDLE_SUFFIXES):
+    """Delete precompressed siblings of a bundle that are no longer produced."""
+    for suffix in suffixes:
+        path = bundle_path.with_name(bundle_path.name + suffix)
+        if path.exists():
+            path.unlink()
+            print(f"  Removed stale {path.name}")
+
+
+def write_compressed_bundle(bundle_path, previous=None):
+    """
+    Write minified, precompressed siblings of a bundle file.
+
+    Writes <bundle>.gz (gzip level 9) and, if the brotli package is
+    installed, <bundle>.br (quality 11), both holding the bundle minified.
+    Without brotli, an old .br is deleted so it cannot be served with
+    stale content. The gzip header carries no name or timestamp, so the
+    output only depends on the bundle; files already holding the same
+    bytes are not rewritten.
+
+    Args:
+        bundle_path: Path to telar-demo-bundle.json
+        previous: Record returned by the last call for this bundle; if the
+            bundle's bytes are unchanged since then and its siblings are
+            all present, nothing is recompressed
+
+    Returns:
+        Dict with 'bundle_sha256' (of the bundle compressed) and 'sizes':
+        bytes for 'raw', 'minified', 'gzip' and 'brotli' (the latter only
+        if brotli is available)
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        remove_compressed_bundle(bundle_path, ('.br',))
+
+    bundle_sha256 = _sha256_file(bundle_path)
+    gzip_path = bundle_path.with_name(bundle_path.name + '.gz')
+    brotli_path = bundle_path.with_name(bundle_path.name + '.br')
+    if (previous and previous.get('bundle_sha256') == bundle_sha256 and gzip_path.exists()
+            and ('brotli' in previous.get('sizes', {})) == (brotli is not None)
+            and (brotli is None or brotli_path.exists())):
+        return previous
+
+    raw = bundle_path.read_bytes()
+    minified = dumps_json(json.loads(raw), pretty=False).encode('utf-8')
+    sizes = {'raw': len(raw), 'minified': len(minified)}
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, compresslevel=9, mtime=0) as f:
+        f.write(minified)
+    compressed = buffer.getvalue()
+    _write_if_changed(gzip_path, compressed)
+    sizes['gzip'] = len(compressed)
+
+    if brotli is not None:
+        compressed = brotli.compress(minified, quality=11, mode=brotli.MODE_TEXT)
+        _write_if_changed(brotli_path, compressed)
+        sizes['brotli'] = len(compressed)
+    return {'bundle_sha256': bundle_sha256, 'sizes': sizes}
+
+
+def _report_bundle_sizes(sizes):
+    line = f"  Sizes: {sizes['raw']:,} bytes raw, {sizes['minified']:,} minified, {sizes['gzip']:,} gzip"
+    if 'brotli' in sizes:
+        line += f", {sizes['brotli']:,} brotli"
+    print(line)
+
+
+# Object fields kept in the sharded index's object summaries
+INDEX_OBJECT_FIELDS = ('title', 'creator', 'year', 'object_type', 'featured', 'thumbnail',
+                       'source_url')
+
+
+# Shard files are named by the first 16 hex digits of their content's SHA-256
+SHARD_NAME_PATTERN = re.compile(r'^[0-9a-f]{16}\.json$')
+
+# Lists the shards of the index generation before the current one, which
+# are kept so that clients holding a cached older index can still load them
+SHARDS_PREVIOUS_GENERATION = "previous-generation.json"
+
+
+def _index_shard_names(index):
+    """Return the shard file names an index's "shards" field refers to."""
+    names = set()
+    pending = [index.get("shards", {})]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, str):
+            names.add(value.rsplit('/', 1)[-1])
+    return names
+
+
+def _story_texts(story, texts):
+    """Return the entries of a texts table that a story's layers refer to."""
+    refs = {}
+    for step in story.get("steps", []):
+        for layer in step.get("layers", {}).values():
+            for key in ("content_ref", "content_html_ref"):
+                ref = layer.get(key)
+                if ref in texts:
+                    refs[ref] = texts[ref]
+    return refs
+
+
+def _write_shard(shards_dir, value):
+    """Write value as a minified JSON shard named by its content hash; return the name."""
+    data = dumps_json(value, pretty=False, sort_keys=True).encode('utf-8')
+    name = f"{hashlib.sha256(data).hexdigest()[:16]}.json"
+    _write_if_changed(shards_dir / name, data)
+    return name
+
+
+def write_sharded_bundle(bundle, lang_dir):
+    """
+    Write the sharded form of a bundle next to telar-demo-bundle.json.
+
+    telar-demo-index.json holds _meta, iiif_base_url, project and a
+    summary of each object (INDEX_OBJECT_FIELDS). The full objects, each
+    story and the glossary are written to shards/<hash>.json, named by a
+    hash of their content, so a shard's URL changes whenever its content
+    does and can be cached forever. The index maps each to its shard. If
+    the bundle has a texts table (see dedupe_layer_texts()), each story
+    shard carries the entries its layers refer to under "texts", so a
+    story can be rendered from its own shard.
+
+    Whenever the index changes, the shards the old index referred to are
+    recorded in shards/previous-generation.json and kept, so a client
+    holding the previous index (it is only revalidated, not cached
+    forever) can still fetch its shards. Shards referenced by neither the
+    current nor the previous index are removed.
+
+    Returns:
+        Path of the index file
+    """
+    shards_dir = lang_dir / "shards"
+    shards_dir.mkdir(exist_ok=True)
+
+    texts = bundle.get("texts")
+    stories = {}
+    for story_id, story in bundle.get("stories", {}).items():
+        if texts is not None:
+            story = {**story, "texts": _story_texts(story, texts)}
+        stories[story_id] = _write_shard(shards_dir, story)
+
+    shards = {
+        "objects": _write_shard(shards_dir, bundle.get("objects", {})),
+        "glossary": _write_shard(shards_dir, bundle.get("glossary", {})),
+        "stories": stories,
+    }
+
+    index = {
+        "_meta": {**bundle["_meta"], "bundle_layout": "sharded"},
+        "iiif_base_url": bundle.get("iiif_base_url"),
+        "project": bundle.get("project", []),
+        "objects": {
+            object_id: {field: obj[field] for field in INDEX_OBJECT_FIELDS if field in obj}
+            for object_id, obj in bundle.get("objects", {}).items()
+        },
+        "shards": {
+            "objects": f"shards/{shards['objects']}",
+            "glossary": f"shards/{shards['glossary']}",
+            "stories": {story_id: f"shards/{name}" for story_id, name in shards["stories"].items()},
+        },
+    }
+
+    referenced = _index_shard_names(index)
+    index_path = lang_dir / "telar-demo-index.json"
+    previous_path = shards_dir / SHARDS_PREVIOUS_GENERATION
+
+    previous = set()
+    if previous_path.exists():
+        try:
+            with open(previous_path, 'r', encoding='utf-8') as f:
+                previous = set(json.load(f).get("shards", []))
+        except Exception as e:
+            print(f"  Warning: Could not read {previous_path}: {e}")
+    data = dumps_json(index).encode('utf-8')
+    if index_path.exists() and index_path.read_bytes() != data:
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                previous = _index_shard_names(json.load(f))
+        except Exception as e:
+            print(f"  Warning: Could not read {index_path}: {e}")
+            previous = set()
+        _write_if_changed(previous_path, dumps_json({"shards": sorted(previous)}).encode('utf-8'))
+
+    kept = referenced | previous
+    for path in shards_dir.glob("*.json"):
+        if SHARD_NAME_PATTERN.match(path.name) and path.name not in kept:
+            path.unlink()
+
+    _write_if_changed(index_path, data)
+    print(f"  Sharded: {index_path.name} + {len(referenced)} shards "
+          f"({len(previous - referenced)} kept from the previous index)")
+    return index_path
+
+
+def _write_bundle_artifacts(bundle_path, options, bundle=None, previous=None):
+    """
+    Write the optional artifacts derived from a bundle file.
+
+    previous is the bundle's build-state entry from the last run, if any.
+    Returns the record of the compressed siblings (see
+    write_compressed_bundle()), or None if compression is off; their
+    stale files are then deleted.
+    """
+    compressed = None
+    if options['compress']:
+        compressed = write_compressed_bundle(bundle_path, (previous or {}).get('compressed'))
+        _report_bundle_sizes(compressed['sizes'])
+    else:
+        remove_compressed_bundle(bundle_path)
+    if options['sharded']:
+        if bundle is None:
+            with open(bundle_path, 'r', encoding='utf-8') as f:
+                bundle = json.load(f)
+        write_sharded_bundle(bundle, bundle_path.parent)
+    return compressed
+
+
+def build_language_bundle(version, lang, lang_dir, base_url, thumbnail_width=None,
+                          previous=None, force=False, options=None):
+    """
+    Generate, validate and write telar-demo-bundle.json for one language.
+
+    The bundle is skipped if previous (its demos/build-state.json entry)
+    shows that none of its inputs changed; its recorded warnings are
+    reported again. A rebuilt bundle whose content matches the file on
+    disk apart from the "generated" timestamp is not rewritten either.
+
+    options (see DEFAULT_BUNDLE_OPTIONS):
+        reproducible: write the bundle with sorted keys, a timestamp
+            derived from its inputs and a content hash (see
+            make_reproducible()); rewrite it only if its bytes differ
+        compress: keep minified .gz/.br siblings up to date and print the
+            bundle's sizes (see write_compressed_bundle()); when off, any
+            existing siblings are deleted
+        sharded: also write the sharded index and shards (see
+            write_sharded_bundle())
+        dedupe_texts: store layer bodies once in a "texts" table that
+            layers reference by hash (see dedupe_layer_texts())
+        render_html: add pre-rendered "content_html" to layers and
+            glossary entries (see render_bundle_html())
+        schema_check: also check the bundle against its JSON schema
+            (see check_bundle())
+
+    Args:
+        version: Telar version string (e.g., "0.6.0")
+        lang: Language code (e.g., "en", "es")
+        lang_dir: Path to the language directory
+        base_url: Base URL for IIIF content
+        thumbnail_width: Target thumbnail width for self-hosted objects
+        previous: Build-state entry from the last run, if any
+        force: Rebuild even if the inputs are unchanged
+        options: Dict of bundle options
+
+    Returns:
+        Tuple of (status, warnings_list, state_entry); status is 'built',
+        'unchanged' or 'empty' (no content, nothing written)
+    """
+    options = {**DEFAULT_BUNDLE_OPTIONS, **(options or {})}
+    reproducible = options['reproducible']
+    thumbnail_width = thumbnail_width or DEFAULT_THUMBNAIL_WIDTH
+    bundle_path = lang_dir / "telar-demo-bundle.json"
+
+    settings = {
+        "generator": GENERATOR_VERSION,
+        "base_url": base_url,
+        "thumbnail_width": thumbnail_width,
+    }
+    if reproducible:
+        settings["reproducible"] = True
+        settings["source_date_epoch"] = os.environ.get('SOURCE_DATE_EPOCH')
+    if options['dedupe_texts']:
+        settings["dedupe_texts"] = True
+    if options['render_html']:
+        settings["render_html"] = True
+        settings["html_renderer"] = html_renderer()
+    if options['schema_check']:
+        settings["schema_check"] = True
+
+    if not force and _bundle_up_to_date(previous, bundle_path, settings):
+        print(f"\nProcessing language: {lang}")
+        print(f"  Inputs unchanged, keeping {bundle_path}")
+        entry = {key: value for key, value in previous.items() if key != 'compressed'}
+        compressed = _write_bundle_artifacts(bundle_path, options, previous=previous)
+        if compressed:
+            entry['compressed'] = compressed
+        return 'unchanged', list(previous.get('warnings', [])), entry
+
+    deps = set()
+    bundle, warnings = generate_bundle(version, lang, lang_dir, base_url, thumbnail_width, deps)
+
+    # Validate bundle against its schema and check references
+    issues = check_bundle(bundle, options['schema_check'])
+    warnings.extend(format_bundle_issue(issue, lang) for issue in issues)
+
+    # Check if bundle has content
+    if not bundle["project"] and not bundle["objects"]:
+        warnings.append(f"[{lang}] No content found, skipping language")
+        remove_compressed_bundle(bundle_path)
+        return 'empty', warnings, None
+
+    if options['render_html']:
+        stats = render_bundle_html(bundle)
+        print(f"  HTML: {stats['rendered']} rendered, {stats['cached']} from cache")
+    if options['dedupe_texts']:
+        layers_seen, table_size = dedupe_layer_texts(bundle)
+        print(f"  Layer texts: {layers_seen} layers, {table_size} texts table entries")
+    if reproducible:
+        make_reproducible(bundle, deps)
+        # Byte-identical output is detected while replacing the file
+        written = write_bundle_json(bundle, bundle_path, sort_keys=True, skip_if_identical=True)
+    else:
+        unchanged = False
+        if bundle_path.exists():
+            try:
+                with open(bundle_path, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+                unchanged = _without_timestamp(existing) == _without_timestamp(bundle)
+            except Exception:
+                unchanged = False
+        if unchanged:
+            # Derived artifacts (the sharded index) must match the kept
+            # file, including its "generated" timestamp
+            bundle = existing
+        written = not unchanged and write_bundle_json(bundle, bundle_path)
+
+    if written:
+        status = 'built'
+        print(f"  Written: {bundle_path}")
+    else:
+        status = 'unchanged'
+        print(f"  Content unchanged, keeping {bundle_path}")
+
+    compressed = _write_bundle_artifacts(bundle_path, options, bundle, previous)
+
+    entry = {
+        **settings,
+        "bundle_sha256": _sha256_file(bundle_path),
+        "inputs": {_state_key(path): _dependency_hash(path)
+                   for path in sorted(deps, key=_state_key)},
+        "warnings": warnings,
+        "issues": issues,
+    }
+    if compressed:
+        entry["compressed"] = compressed
+    return status, warnings, entry
+
+
+def _language_dirs(version_dir):
+    """Return the language directories of a version directory, sorted by name."""
+    return [
+        lang_dir for lang_dir in sorted(version_dir.iterdir())
+        if lang_dir.is_dir() and not lang_dir.name.startswith('.')
+    ]
+
+
+def generate_bundles_for_version(version, base_url=None, thumbnail_width=None, force=False,
+                                 options=None):
+    """
+    Generate telar-demo-bundle.json for all languages in a version.
+
+    Languages whose inputs are unchanged since the last run (see
+    demos/build-state.json) are skipped unless force is set.
+
+    Args:
+        version: Telar version string (e.g., "0.6.0")
+        base_url: Base URL for IIIF content
+        thumbnail_width: Target thumbnail width for self-hosted objects
+        force: Rebuild bundles even if their inputs are unchanged
+        options: Dict of bundle options (see build_language_bundle())
+
+    Returns:
+        Tuple of (success_bool, all_warnings_list)
+    """
+    if not base_url:
+        base_url = DEFAULT_BASE_URL
+
+    version_dir = DEMOS_DIR / f"v{version}"
+
+    if not version_dir.exists():
+        print(f"Error: Version directory does not exist: {version_dir}")
+        sys.exit(1)
+
+    all_warnings = []
+    bundles_generated = 0
+
+    previous_state = load_bundle_build_state()
+    # Entries for this version are replaced; other versions are kept
+    prefix = f"v{version}/"
+    build_state = {key: entry for key, entry in previous_state.items()
+                   if not key.startswith(prefix)}
+
+    # Scan each language directory
+    for lang_dir in _language_dirs(version_dir):
+        key = prefix + lang_dir.name
+        status, warnings, entry = build_language_bundle(
+            version, lang_dir.name, lang_dir, base_url, thumbnail_width,
+            previous_state.get(key), force, options)
+        all_warnings.extend(warnings)
+        if entry is not None:
+            build_state[key] = entry
+        if status != 'empty':
+            bundles_generated += 1
+
+    save_bundle_build_state(build_state)
+
+    return bundles_generated > 0, all_warnings
+
+
+def _parse_version(version):
+    """Sort key for version strings like '0.9.0'; malformed versions sort first."""
+    try:
+        return tuple(int(part) for part in version.split('.'))
+    except ValueError:
+        return (0, 0, 0)
+
+
+def discover_bundle_targets():
+    """
+    Find every demos/v*/<lang>/ directory.
+
+    Returns:
+        List of (version, lang, lang_dir) tuples, oldest version first
+    """
+    if not DEMOS_DIR.exists():
+        return []
+
+    targets = []
+    version_dirs = [item for item in DEMOS_DIR.iterdir()
+                    if item.is_dir() and item.name.startswith('v')]
+    for version_dir in sorted(version_dirs, key=lambda item: _parse_version(item.name[1:])):
+        for lang_dir in _language_dirs(version_dir):
+            targets.append((version_dir.name[1:], lang_dir.name, lang_dir))
+    return targets
+
+
+def _build_language_bundle_worker(args):
+    """Process pool entry point: run build_language_bundle() with captured output.
+
+    Returns:
+        Tuple of (status, warnings_list, state_entry, captured_log)
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        status, warnings, entry = build_language_bundle(*args)
+    return status, warnings, entry, log.getvalue()
+
+
+def generate_all_bundles(base_url=None, thumbnail_width=None, jobs=1, force=False,
+                         options=None):
+    """
+    Generate bundles for every version and language under demos/.
+
+    With jobs > 1, languages are built concurrently in a process pool;
+    their logs are printed in version/language order as for a serial run.
+    Warnings are prefixed with their version and returned as one list.
+    Bundles whose inputs are unchanged are skipped unless force is set.
+
+    Args:
+        base_url: Base URL for IIIF content
+        thumbnail_width: Target thumbnail width for self-hosted objects
+        jobs: Number of worker processes (0 = all CPUs)
+        force: Rebuild bundles even if their inputs are unchanged
+        options: Dict of bundle options (see build_language_bundle())
+
+    Returns:
+        Tuple of (success_bool, all_warnings_list)
+    """
+    if not base_url:
+        base_url = DEFAULT_BASE_URL
+
+    targets = discover_bundle_targets()
+    if not targets:
+        print(f"Error: No demos/v*/<lang> directories found in {DEMOS_DIR}")
+        return False, []
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(targets)))
+
+    previous_state = load_bundle_build_state()
+    work = [(version, lang, lang_dir, base_url, thumbnail_width,
+             previous_state.get(f"v{version}/{lang}"), force, options)
+            for version, lang, lang_dir in targets]
+
+    # Parse the shared IIIF inputs once and hand them to every worker
+    catalog = preload_iiif_catalog()
+
+    if jobs == 1:
+        results = (_build_language_bundle_worker(args) for args in work)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=seed_iiif_catalog,
+                                       initargs=(catalog,))
+        # map() yields results in submission order, keeping logs ordered
+        results = executor.map(_build_language_bundle_worker, work)
+
+    all_warnings = []
+    build_state = {}
+    counts = {'built': 0, 'unchanged': 0, 'empty': 0}
+    try:
+        for (version, lang, _), (status, warnings, entry, log) in zip(targets, results):
+            print(f"  [v{version}/{lang}]")
+            print(log, end='')
+            all_warnings.extend(f"[v{version}] {warning}" for warning in warnings)
+            counts[status] += 1
+            if entry is not None:
+                build_state[f"v{version}/{lang}"] = entry
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    save_bundle_build_state(build_state)
+
+    print(f"  Bundles written: {counts['built']}, unchanged: {counts['unchanged']} "
+          f"(of {len(targets)})")
+    return counts['built'] + counts['unchanged'] > 0, all_warnings
+
+
+# =============================================================================
+# IIIF GENERATION
+# =============================================================================
+
+def _tile_backend_available(backend):
+    """Return True if the named tile backend can run on this host."""
+    if backend == 'libvips':
+        return shutil.which('vips') is not None
+    if backend == 'numpy':
+        try:
+            import numpy
+            return True
+        except ImportError:
+            return False
+    if backend == 'iiif':
+        try:
+            from iiif.static import IIIFStatic
+            return True
+        except ImportError:
+            return False
+    return False
+
+
+def _detect_tile_backend():
+    """Detect available IIIF tile generation backend.
+
+    Prefers libvips (fastest), then the in-process NumPy backend, then the
+    Python iiif library.
+    Returns 'libvips', 'numpy', 'iiif', or None.
+    """
+    for backend in TILE_BACKENDS:
+        if _tile_backend_available(backend):
+            return backend
+    return None
+
+
+def check_iiif_dependencies(backend=None):
+    """Check if required dependencies for IIIF generation are installed.
+
+    Args:
+        backend: Backend requested by the user, or None to auto-detect
+
+    Returns:
+        Backend name ('libvips', 'numpy' or 'iiif') if ready, None if not.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        print("Missing required dependency: Pillow")
+        print("  pip install Pillow")
+        return None
+
+    if backend:
+        if not _tile_backend_available(backend):
+            print(f"Requested tile backend '{backend}' is not available")
+            return None
+        return backend
+
+    backend = _detect_tile_backend()
+    if backend is None:
+        print("No IIIF tile generation backend found!")
+        print("\nInstall one of:")
+        print("  libvips (recommended): brew install vips  (macOS)")
+        print("                         sudo apt-get install libvips-dev  (Linux)")
+        print("  NumPy:                 pip install numpy")
+        print("  Python iiif library:   pip install iiif")
+        return None
+
+    return backend
+
+
+def read_iiif_objects_csv():
+    """Read iiif/all-demo-objects.csv and return list of objects with multilingual metadata"""
+    csv_path = IIIF_DIR / "all-demo-objects.csv"
+
+    if not csv_path.exists():
+        print(f"Error: {csv_path} not found")
+        return None
+
+    try:
+        return list(iiif_catalog())
+    except Exception as e:
+        print(f"Error reading {csv_path}: {e}")
+        return None
+
+
+def _flatten_to_rgb(img):
+    """Convert a decoded image to RGB (or keep L), flattening alpha onto white.
+
+    Works strip by strip into a single RGB canvas, so the only full-size
+    allocation besides the source is the output itself (no alpha band or
+    converted copy of the whole image).
+    """
+    from PIL import Image
+
+    if img.mode in ('RGB', 'L'):
+        return img
+
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (
+        img.mode == 'P' and 'transparency' in img.info)
+    if has_alpha:
+        print(f"    Converting {img.mode} to RGB")
+
+    width, height = img.size
+    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+    for top in range(0, height, PREPROCESS_STRIP_ROWS):
+        box = (0, top, width, min(top + PREPROCESS_STRIP_ROWS, height))
+        strip = img.crop(box)
+        if has_alpha:
+            strip = strip.convert('RGBA')
+            rgb_img.paste(strip, box, mask=strip.getchannel('A'))
+        else:
+            rgb_img.paste(strip.convert('RGB'), box)
+    return rgb_img
+
+
+def _estimate_preprocess_bytes(img, rotate):
+    """Estimate peak bytes for normalizing img with Pillow.
+
+    Counts the decoded source, the RGB output and, when an EXIF rotation
+    has to be applied, the transposed copy.
+    """
+    width, height = img.size
+    pixels = width * height
+    total = pixels * len(img.getbands()) + pixels * 3
+    if rotate:
+        total += pixels * len(img.getbands())
+    return total
+
+
+def _preprocess_libvips(image_path, dest_path, mode, has_alpha, rotate, memory_budget_mb):
+    """Normalize an image to a quality-95 JPEG with libvips.
+
+    libvips processes the image in small regions instead of decoding the
+    whole bitmap, which is what keeps memory low for huge scans. With
+    pyvips installed, autorotation, flattening, colour conversion and
+    encoding run as one pipeline, and nothing touches the disk except the
+    output. Otherwise each needed step is a vips command; only the steps
+    before the last go through a .v intermediate (the last one writes the
+    JPEG directly), and an image needing a single step has none.
+
+    VIPS_DISC_THRESHOLD is set to the memory budget for the vips
+    commands. It decides when libvips decodes a source that cannot be read
+    region by region (PNG, most TIFFs) to a temporary disk file instead of
+    memory; it is not a cap on the process's memory.
+    """
+    needs_colourspace = mode not in ('RGB', 'L', 'RGBA', 'LA', 'P', 'PA')
+
+    try:
+        import pyvips
+    except (ImportError, OSError):
+        pyvips = None
+
+    if pyvips is not None:
+        # Rotation needs random access; otherwise read strictly top to bottom
+        image = pyvips.Image.new_from_file(
+            str(image_path), access='random' if rotate else 'sequential')
+        if rotate:
+            image = image.autorot()
+        if has_alpha:
+            image = image.flatten(background=255)
+        if needs_colourspace:
+            # CMYK, Lab, 16-bit etc. — jpegsave would keep CMYK as-is
+            image = image.colourspace('srgb')
+        image.jpegsave(str(dest_path), Q=95)
+        return
+
+    env = dict(os.environ)
+    env['VIPS_DISC_THRESHOLD'] = f"{memory_budget_mb}m"
+
+    steps = []
+    if rotate:
+        steps.append(('autorot', []))
+    if has_alpha:
+        steps.append(('flatten', ['--background', '255']))
+    if needs_colourspace:
+        steps.append(('colourspace', ['srgb']))
+    if not steps:
+        steps.append(('copy', []))
+
+    work_dir = Path(tempfile.mkdtemp(dir=dest_path.parent))
+    try:
+        current = str(image_path)
+        for i, (operation, extra_args) in enumerate(steps):
+            if i == len(steps) - 1:
+                out = f"{dest_path}[Q=95]"
+            else:
+                out = str(work_dir / f"step{i}.v")
+            cmd = ['vips', operation, current, out] + extra_args
+            result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            if result.returncode != 0:
+                raise RuntimeError(f"vips {operation} failed: {result.stderr}")
+            current = out
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def preprocess_image(image_path, temp_dir=None, memory_budget_mb=None):
+    """Preprocess an image for IIIF tile generation.
+
+    Handles EXIF orientation, transparency removal, palette mode conversion,
+    and format conversion to JPEG. Both backends need a clean JPEG input.
+
+    The header is inspected first; a baseline RGB/greyscale JPEG without
+    an EXIF rotation is used as-is and never decoded here. Anything else is
+    decoded once, normalized and encoded once. The resulting file is the
+    single source for the tiles, full/max and the base image.
+
+    If normalizing with Pillow would need more than memory_budget_mb, the
+    work is handed to libvips instead (when the vips binary is available).
+
+    Args:
+        image_path: Path to the source image
+        temp_dir: Directory for the normalized temp JPEG (defaults to the
+                  system temp dir); use one on the output filesystem so
+                  the file can later be moved into place
+        memory_budget_mb: Peak memory budget for preprocessing
+                          (default: DEFAULT_MEMORY_BUDGET_MB)
+
+    Returns:
         (processed_path, temp_file_path_or_None)
+
+    Raises:
+        RuntimeError: If the source cannot be read or normalized; the
+                      object fails rather than publishing the source bytes
+                      under a .jpg name
     """
     from PIL import Image, ImageOps
 
+    if memory_budget_mb is None:
+        memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+
     processed_path = image_path
     temp_path = None
 
     try:
+        # Image.open() only reads the header; pixels are decoded on demand
         img = Image.open(image_path)
 
-        # Apply EXIF orientation if present
-        img = ImageOps.exif_transpose(img) or img
-
-        # Check for EXIF orientation metadata
         exif = img.getexif()
-        has_exif_orientation = exif and 274 in exif and exif[274] != 1
-
-        # Convert to RGB if needed
-        converted_img = img
-        needs_conversion = False
-
-        if img.mode in ['RGBA', 'LA']:
-            print(f"    Converting {img.mode} to RGB")
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[-1])
-            converted_img = rgb_img
-            needs_conversion = True
-        elif img.mode == 'P':
-            converted_img = img.convert('RGB')
-            needs_conversion = True
-        elif img.mode not in ['RGB', 'L']:
-            converted_img = img.convert('RGB')
-            needs_conversion = True
-
-        file_ext = image_path.suffix.lower()
-        if has_exif_orientation or needs_conversion or file_ext not in ['.jpg', '.jpeg']:
-            tf = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-            converted_img.save(tf.name, 'JPEG', quality=95)
-            processed_path = Path(tf.name)
-            temp_path = tf.name
+        has_exif_orientation = bool(exif) and exif.get(274, 1) != 1
+        needs_conversion = img.mode not in ('RGB', 'L')
+
+        if has_exif_orientation or needs_conversion or img.format != 'JPEG':
+            tf = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False, dir=temp_dir)
             tf.close()
+            temp_path = tf.name
+
+            estimate = _estimate_preprocess_bytes(img, has_exif_orientation)
+            if estimate > memory_budget_mb * 1024 * 1024:
+                if shutil.which('vips'):
+                    print(f"    Large image ({estimate // (1024 * 1024)} MB decoded), "
+                          f"preprocessing with libvips")
+                    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (
+                        img.mode == 'P' and 'transparency' in img.info)
+                    mode = img.mode
+                    img.close()
+                    _preprocess_libvips(image_path, Path(temp_path), mode, has_alpha,
+                                        has_exif_orientation, memory_budget_mb)
+                    return Path(temp_path), temp_path
+                print(f"    Warning: Image needs ~{estimate // (1024 * 1024)} MB to preprocess "
+                      f"(budget {memory_budget_mb} MB); install libvips for low-memory preprocessing")
+
+            img = ImageOps.exif_transpose(img) or img
+            img = _flatten_to_rgb(img)
+            img.save(temp_path, 'JPEG', quality=95)
+            processed_path = Path(temp_path)
 
     except Exception as e:
-        print(f"    Warning: Error preprocessing image: {e}")
+        if temp_path:
+            Path(temp_path).unlink(missing_ok=True)
+        raise RuntimeError(f"Could not preprocess {image_path.name}: {e}") from e
 
     return processed_path, temp_path
 
 
+def _link_or_copy(src, dest):
+    """Hardlink src to dest, falling back to a byte copy across filesystems."""
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
 def _generate_tiles_libvips(processed_path, tiles_dir, object_id, base_url):
     """Generate IIIF tiles using libvips (vips dzsave)."""
     parent_dir = tiles_dir.parent
@@ -952,14 +2358,16 @@ def _generate_tiles_libvips(processed_path, tiles_dir, object_id, base_url):
     if vips_props.exists():
         vips_props.unlink()
 
-    # Post-process: patch info.json, generate full/max image, create compat dirs
-    _patch_info_json(tiles_dir, object_id, base_url)
-    _generate_full_max(processed_path, tiles_dir)
-    _create_compat_size_dirs(tiles_dir)
+    # info.json is patched, and full/max and the compat size dirs are
+    # added, by generate_iiif_for_image()
 
 
-def _patch_info_json(tiles_dir, object_id, base_url):
-    """Patch libvips-generated info.json with correct id and sizes."""
+def _patch_info_json(tiles_dir, object_id, base_url, extra_formats=None):
+    """Patch libvips-generated info.json with correct id and sizes.
+
+    extra_formats lists the encodings written next to every default.jpg
+    (e.g. ['webp']); they are advertised in extraFormats after 'jpg'.
+    """
     info_path = tiles_dir / 'info.json'
     if not info_path.exists():
         return
@@ -987,47 +2395,380 @@ def _patch_info_json(tiles_dir, object_id, base_url):
         sizes.sort(key=lambda s: s['width'])
         info['sizes'] = sizes
 
-    info['extraFormats'] = ['jpg']
+    info['extraFormats'] = ['jpg'] + list(extra_formats or [])
     info['extraQualities'] = ['default']
 
     with open(info_path, 'w') as f:
-        json.dump(info, f, indent=2)
+        dump_json(info, f, ensure_ascii=True)
 
 
-def _generate_full_max(processed_path, tiles_dir):
-    """Generate full/max/0/default.jpg for IIIF 3.0 viewers."""
-    from PIL import Image
+def _generate_full_max(base_image_path, tiles_dir):
+    """Provide full/max/0/default.jpg for IIIF 3.0 viewers.
 
+    The base image already holds the normalized full-resolution JPEG, so
+    full/max is a hardlink (or byte copy) of it rather than a re-encode.
+    """
     max_dir = tiles_dir / 'full' / 'max' / '0'
     max_dir.mkdir(parents=True, exist_ok=True)
-    dest = max_dir / 'default.jpg'
+    _link_or_copy(base_image_path, max_dir / 'default.jpg')
+
+
+def _generate_size_ladder(base_image_path, tiles_dir, widths):
+    """Pre-render full/{w},{h}/0/default.jpg for each requested width.
+
+    The base image is decoded once, and only at the reduced scale the
+    largest requested width needs: JPEG draft mode lets libjpeg scale by
+    1/2, 1/4 or 1/8 while decoding. Sizes are produced largest first, each
+    resampled from the previous one, so every step is a small reduction.
+    Widths at or above the full width are skipped (full/max covers them).
+    _patch_info_json() then lists the new sizes in info.json.
+    """
+    from PIL import Image
+
+    with Image.open(base_image_path) as img:
+        full_width, full_height = img.size
+        ladder = [(width, max(1, round(full_height * width / full_width)))
+                  for width in sorted(set(widths), reverse=True)
+                  if 1 <= width < full_width]
+        if not ladder:
+            return
+        img.draft(img.mode, ladder[0])
+        img.load()
+        current = img
+        for width, height in ladder:
+            current = current.resize((width, height), Image.LANCZOS)
+            dest_dir = tiles_dir / 'full' / f"{width},{height}" / '0'
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            current.save(dest_dir / 'default.jpg', 'JPEG', quality=TILE_JPEG_QUALITY)
+
+
+def available_extra_formats(formats):
+    """Return the subset of formats this Pillow build can encode, warning
+    about the rest."""
+    from PIL import features
+
+    available = []
+    for name in formats:
+        if name not in EXTRA_TILE_FORMATS:
+            print(f"Warning: Unknown tile format '{name}' (choose from {', '.join(EXTRA_TILE_FORMATS)})")
+        elif not features.check(name):
+            print(f"Warning: Pillow was built without {name} support; skipping {name} tiles")
+        else:
+            available.append(name)
+    return available
+
+
+def _extra_format_targets(tiles_dir):
+    """Map each default.jpg under tiles_dir to the part of the full image it shows.
+
+    Returns:
+        List of (jpeg_path, region, size): region is (x, y, w, h) in
+        full-resolution pixels, size the (width, height) of the image file.
+        Tiles come from their {x},{y},{w},{h}/{tw},{th} path, full/{w},{h}
+        and full/max show the whole image.
+    """
+    info_path = tiles_dir / 'info.json'
+    with open(info_path, 'r') as f:
+        info = json.load(f)
+    full_region = (0, 0, info['width'], info['height'])
+
+    targets = []
+    for path in sorted(tiles_dir.rglob('default.jpg')):
+        if path.is_symlink():
+            continue
+        parts = path.relative_to(tiles_dir).parts
+        if len(parts) != 4:
+            continue
+        region = re.match(r'^(\d+),(\d+),(\d+),(\d+)$', parts[0])
+        size = re.match(r'^(\d+),(\d+)$', parts[1])
+        if region and size:
+            targets.append((path, tuple(int(v) for v in region.groups()),
+                            (int(size.group(1)), int(size.group(2)))))
+        elif parts[0] == 'full' and parts[1] == 'max':
+            targets.append((path, full_region, full_region[2:]))
+        elif parts[0] == 'full' and size:
+            targets.append((path, full_region, (int(size.group(1)), int(size.group(2)))))
+    return targets
+
+
+def _generate_extra_formats(tiles_dir, base_image_path, formats, quality=None, effort=None,
+                            memory_budget_mb=None):
+    """Write default.{webp,avif} next to every default.jpg under tiles_dir.
+
+    Each file is encoded from the base image's pixels, not from the JPEG
+    tile beside it, so the extra formats do not inherit its artifacts. The
+    base image is decoded once and halved into levels as needed, and each
+    tile is cut from the level closest to its scale. Images larger than
+    EXTRA_FORMAT_MAX_DIMENSION for a format are skipped. A file that fails
+    to encode produces a warning and stays JPEG only; the object is still
+    built.
+
+    The levels must fit in memory_budget_mb (default:
+    DEFAULT_MEMORY_BUDGET_MB), the same budget preprocess_image() uses. If
+    the full-resolution levels would not, the base image is decoded at a
+    reduced JPEG draft scale (1/2, 1/4 or 1/8) that fits, and the tiles
+    that need finer pixels stay JPEG only, with a warning.
+
+    Runs before the compat size dirs are created, so those pick up the
+    extra encodings through their links. Encoding happens on a thread
+    pool (Pillow releases the GIL while encoding).
 
-    img = Image.open(processed_path)
-    if img.mode not in ('RGB', 'L'):
-        img = img.convert('RGB')
-    img.save(dest, 'JPEG', quality=95)
+    Returns:
+        Dict mapping each format to {'bytes': bytes written, 'jpg_bytes':
+        bytes of the JPEGs those files sit next to, 'skipped': files not
+        written}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from PIL import Image
 
+    if quality is None:
+        quality = DEFAULT_ENCODER_QUALITY
+    if effort is None:
+        effort = DEFAULT_ENCODER_EFFORT
+    if memory_budget_mb is None:
+        memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+
+    targets = _extra_format_targets(tiles_dir)
+
+    def level_scale(region, size):
+        scale = 1
+        while region[2] >= size[0] * scale * 2 and region[3] >= size[1] * scale * 2:
+            scale *= 2
+        return scale
+
+    with Image.open(base_image_path) as img:
+        full_width, full_height = img.size
+        # A level and all its halvings take 4/3 of its decoded size
+        bands = len(img.getbands())
+        min_scale = 1
+        while (full_width * full_height * bands * 4 // 3 // (min_scale * min_scale)
+               > memory_budget_mb * 1024 * 1024):
+            min_scale *= 2
+        if min_scale > 8:
+            print(f"    Warning: Base image too large to encode {', '.join(formats)} within "
+                  f"--memory-budget {memory_budget_mb} MB; skipping extra formats")
+            return {name: {'bytes': 0, 'jpg_bytes': 0, 'skipped': len(targets)} for name in formats}
+        if min_scale > 1:
+            img.draft(img.mode, (-(-full_width // min_scale), -(-full_height // min_scale)))
+            # Draft picks the largest DCT scale that still covers the request
+            min_scale = round(full_width / img.size[0])
+        base = img.convert('RGB') if img.mode not in ('RGB', 'L') else img.copy()
+
+    coarse = [target for target in targets if level_scale(target[1], target[2]) < min_scale]
+    if coarse:
+        print(f"    Warning: {len(coarse)} full-resolution tiles stay JPEG only: decoding them "
+              f"for {', '.join(formats)} would exceed --memory-budget {memory_budget_mb} MB")
+        for jpeg_path, _region, _size in coarse:
+            for name in formats:
+                jpeg_path.with_name(f"default.{EXTRA_TILE_FORMATS[name][1]}").unlink(missing_ok=True)
+        targets = [target for target in targets if level_scale(target[1], target[2]) >= min_scale]
+
+    # Halved levels of the base image (scale factor -> image), built
+    # before encoding starts so threads only read them
+    levels = {min_scale: base}
+
+    for scale in sorted({level_scale(region, size) for _path, region, size in targets}):
+        current = min_scale
+        while current < scale:
+            if current * 2 not in levels:
+                levels[current * 2] = levels[current].reduce(2)
+            current *= 2
+
+    def render(region, size):
+        scale = level_scale(region, size)
+        x, y, w, h = (value / scale for value in region)
+        box = (x, y, x + w, y + h)
+        if (w, h) == size and all(value == int(value) for value in box):
+            return levels[scale].crop(tuple(int(value) for value in box))
+        return levels[scale].resize(size, Image.LANCZOS, box=box)
+
+    def encode(target):
+        jpeg_path, region, size = target
+        jpeg_bytes = jpeg_path.stat().st_size
+        results = {}
+        try:
+            img = render(region, size)
+        except Exception as e:
+            return {name: ('failed', jpeg_bytes, f"{jpeg_path.relative_to(tiles_dir)}: {e}")
+                    for name in formats}
+        for name in formats:
+            pil_format, ext = EXTRA_TILE_FORMATS[name]
+            dest = jpeg_path.with_name(f"default.{ext}")
+            if max(size) > EXTRA_FORMAT_MAX_DIMENSION.get(name, max(size)):
+                dest.unlink(missing_ok=True)
+                results[name] = ('skipped', jpeg_bytes,
+                                 f"{jpeg_path.relative_to(tiles_dir)} is {size[0]}x{size[1]}, "
+                                 f"larger than {name} allows")
+                continue
+            try:
+                if name == 'webp':
+                    img.save(dest, pil_format, quality=quality, method=effort)
+                else:
+                    # AVIF speed runs the other way: 0 slowest .. 10 fastest
+                    img.save(dest, pil_format, quality=quality, speed=max(0, 10 - effort))
+                results[name] = ('written', jpeg_bytes, dest.stat().st_size)
+            except Exception as e:
+                dest.unlink(missing_ok=True)
+                results[name] = ('failed', jpeg_bytes, f"{jpeg_path.relative_to(tiles_dir)}: {e}")
+        return results
+
+    totals = {name: {'bytes': 0, 'jpg_bytes': 0, 'skipped': len(coarse)} for name in formats}
+    notes = []
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for results in pool.map(encode, targets):
+                for name, (status, jpeg_bytes, detail) in results.items():
+                    if status == 'written':
+                        totals[name]['bytes'] += detail
+                        totals[name]['jpg_bytes'] += jpeg_bytes
+                    else:
+                        totals[name]['skipped'] += 1
+                        notes.append((status, name, detail))
+    finally:
+        for level in levels.values():
+            level.close()
 
-def _create_compat_size_dirs(tiles_dir):
+    for status, name, detail in notes:
+        if status == 'skipped':
+            print(f"    Note: No {name} for {detail}")
+        else:
+            print(f"    Warning: Could not encode {name} for {detail}")
+    for name in formats:
+        jpg_bytes = totals[name]['jpg_bytes']
+        saved = jpg_bytes - totals[name]['bytes']
+        percent = (100 * saved / jpg_bytes) if jpg_bytes else 0
+        print(f"    {name}: {totals[name]['bytes']:,} bytes vs jpg {jpg_bytes:,} "
+              f"({percent:.0f}% saved)")
+    return totals
+
+
+def _link_tree(src_dir, dest_dir):
+    """Recreate src_dir at dest_dir with every file hardlinked (copied if
+    the filesystem does not support hardlinks)."""
+    for root, _dirs, files in os.walk(src_dir):
+        target = dest_dir / Path(root).relative_to(src_dir)
+        target.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            _link_or_copy(Path(root) / name, target / name)
+
+
+def _create_compat_size_dirs(tiles_dir, mode='hardlink'):
     """Create w, aliases for w,h directories (IIIF 2.x compatibility).
 
     libvips generates IIIF 3.0 size directories as w,h (e.g. 462,375).
     Pre-v0.9.0 Telar sites construct thumbnail URLs using IIIF 2.x w, format
-    (e.g. 462,). This creates copies so both URL formats resolve.
+    (e.g. 462,). This creates aliases so both URL formats resolve.
+
+    Args:
+        tiles_dir: Object output directory
+        mode: 'hardlink' (default; same bytes on disk, falls back to copying),
+              'symlink' (relative directory symlink, for hosts that serve
+              symlinks) or 'copy'
     """
     full_dir = tiles_dir / 'full'
     if not full_dir.exists():
         return
     for entry in full_dir.iterdir():
-        if not entry.is_dir():
+        if not entry.is_dir() or entry.is_symlink():
             continue
         match = re.match(r'^(\d+),(\d+)$', entry.name)
         if match:
             compat_dir = full_dir / f"{match.group(1)},"
-            if not compat_dir.exists():
+            if compat_dir.exists() or compat_dir.is_symlink():
+                continue
+            if mode == 'symlink':
+                compat_dir.symlink_to(entry.name, target_is_directory=True)
+            elif mode == 'hardlink':
+                _link_tree(entry, compat_dir)
+            else:
                 shutil.copytree(entry, compat_dir)
 
 
+def _same_tree(dir_a, dir_b):
+    """True if two directories hold the same relative files with equal bytes."""
+    def listing(root):
+        return sorted(p.relative_to(root) for p in root.rglob('*') if p.is_file())
+
+    files = listing(dir_a)
+    if files != listing(dir_b):
+        return False
+    return all(_sha256_file(dir_a / rel) == _sha256_file(dir_b / rel) for rel in files)
+
+
+def dedup_iiif_objects(mode='hardlink'):
+    """
+    Remove duplicate bytes from the existing iiif/objects/ tree.
+
+    With mode='symlink', every full/w, compat directory that matches its
+    full/w,h directory is replaced by a symlink to it. With
+    mode='hardlink', files with identical content inside each object
+    directory (compat sizes, full/max vs. the base image, ...) are
+    hardlinked to a single copy. Either way only working-tree disk space
+    is saved: git stores identical files as one blob regardless.
+
+    Returns:
+        Number of bytes no longer stored separately
+    """
+    if mode not in ('hardlink', 'symlink'):
+        raise ValueError(f"Unsupported dedup mode: {mode}")
+    objects_dir = IIIF_DIR / "objects"
+    if not objects_dir.exists():
+        print("No IIIF objects to deduplicate")
+        return 0
+
+    print("\n[IIIF Deduplication]")
+    print("-" * 40)
+
+    saved_total = 0
+    for object_dir in sorted(objects_dir.iterdir()):
+        if not object_dir.is_dir():
+            continue
+        saved = 0
+
+        if mode == 'symlink':
+            full_dir = object_dir / 'full'
+            if full_dir.exists():
+                for entry in sorted(full_dir.iterdir()):
+                    match = re.match(r'^(\d+),(\d+)$', entry.name)
+                    compat_dir = full_dir / f"{match.group(1)}," if match else None
+                    if (compat_dir is None or compat_dir.is_symlink()
+                            or not compat_dir.is_dir() or not _same_tree(entry, compat_dir)):
+                        continue
+                    # Files already hardlinked to the target free nothing
+                    shared = {(st.st_dev, st.st_ino) for st in
+                              (p.stat() for p in entry.rglob('*') if p.is_file())}
+                    size = 0
+                    for path in compat_dir.rglob('*'):
+                        if path.is_file() and not path.is_symlink():
+                            stat = path.stat()
+                            if (stat.st_dev, stat.st_ino) not in shared:
+                                size += stat.st_size
+                    shutil.rmtree(compat_dir)
+                    compat_dir.symlink_to(entry.name, target_is_directory=True)
+                    saved += size
+        else:
+            first_by_hash = {}
+            for path in sorted(object_dir.rglob('*')):
+                if path.is_symlink() or not path.is_file():
+                    continue
+                stat = path.stat()
+                key = (stat.st_size, _sha256_file(path))
+                original = first_by_hash.setdefault(key, path)
+                if original == path or os.path.samefile(original, path):
+                    continue
+                _link_or_copy(original, path)
+                if os.path.samefile(original, path):
+                    saved += stat.st_size
+
+        if saved:
+            print(f"  {object_dir.name}: {saved:,} bytes deduplicated")
+        saved_total += saved
+
+    print("-" * 40)
+    print(f"Deduplicated: {saved_total:,} bytes ({mode})")
+    return saved_total
+
+
 def _generate_tiles_iiif(processed_path, tiles_dir, object_id, base_url):
     """Generate IIIF tiles using the Python iiif library (fallback)."""
     from iiif.static import IIIFStatic
@@ -1043,68 +2784,302 @@ def _generate_tiles_iiif(processed_path, tiles_dir, object_id, base_url):
     sg.generate(src=str(processed_path), identifier=object_id)
 
 
-def generate_iiif_for_image(image_path, output_dir, object_id, base_url, backend):
+def _lanczos_kernel_2x(a=3):
+    """Return (input_offsets, weights) of a Lanczos-a filter for 2x downsampling.
+
+    Output pixel i is centred between input pixels 2i and 2i+1, so input
+    pixel 2i + k sits (k - 0.5) input pixels from the centre.
+    """
+    import numpy as np
+
+    offsets = np.arange(-2 * a + 1, 2 * a + 1)
+    x = (offsets - 0.5) / 2.0
+    weights = np.sinc(x) * np.sinc(x / a)
+    return offsets, weights / weights.sum()
+
+
+def _downsample_2x(level, resample='box', memory_budget_mb=None):
+    """Halve an H x W x C uint8 array, rounding odd dimensions up.
+
+    'box' averages each 2x2 block. 'lanczos' applies a separable Lanczos-3
+    filter before decimating. Edges are replicated, which also gives
+    odd-sized levels the ceil(n/2) size libvips uses.
+
+    The Lanczos filter works in float32 on strips of output rows, sized
+    so that its working arrays stay within memory_budget_mb (default:
+    DEFAULT_MEMORY_BUDGET_MB); only the uint8 result is allocated in full.
+    """
+    import numpy as np
+
+    height, width = level.shape[:2]
+    pad_y, pad_x = height % 2, width % 2
+
+    if resample == 'box':
+        padded = np.pad(level, ((0, pad_y), (0, pad_x), (0, 0)), mode='edge')
+        total = padded.astype(np.uint16)
+        total = total[0::2, 0::2] + total[1::2, 0::2] + total[0::2, 1::2] + total[1::2, 1::2]
+        return ((total + 2) // 4).astype(np.uint8)
+
+    if memory_budget_mb is None:
+        memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+    offsets, weights = _lanczos_kernel_2x()
+    channels = level.shape[2]
+    out_height, out_width = (height + pad_y) // 2, (width + pad_x) // 2
+    result = np.empty((out_height, out_width, channels), dtype=np.uint8)
+
+    # Source columns (clamped at the edges) read by each output column
+    columns = [np.clip(2 * np.arange(out_width) + offset, 0, width - 1) for offset in offsets]
+
+    # Per output row: one float32 source row being read, the vertical
+    # accumulator and the horizontal pass (each about width x channels)
+    row_bytes = 4 * width * channels * 4
+    strip_rows = max(1, min(out_height, memory_budget_mb * 1024 * 1024 // row_bytes))
+
+    for top in range(0, out_height, strip_rows):
+        out_rows = np.arange(top, min(top + strip_rows, out_height))
+        vertical = np.zeros((len(out_rows), width, channels), dtype=np.float32)
+        for offset, weight in zip(offsets, weights):
+            rows = np.clip(2 * out_rows + offset, 0, height - 1)
+            vertical += level[rows].astype(np.float32) * weight
+        horizontal = np.zeros((len(out_rows), out_width, channels), dtype=np.float32)
+        for cols, weight in zip(columns, weights):
+            horizontal += vertical[:, cols] * weight
+        result[out_rows[0]:out_rows[-1] + 1] = np.clip(np.rint(horizontal), 0, 255).astype(np.uint8)
+    return result
+
+
+def _generate_tiles_numpy(processed_path, tiles_dir, object_id, base_url, resample='box',
+                          memory_budget_mb=None):
+    """Generate IIIF tiles in-process with a NumPy image pyramid.
+
+    Produces the same level0 layout as vips dzsave --layout iiif3: one
+    {x},{y},{w},{h}/{tw},{th}/0/default.jpg tile per TILE_SIZE block at
+    each scale factor, halving until a level fits in a single tile. That
+    last level is written as full/{w},{h}/0/default.jpg.
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from PIL import Image
+
+    with Image.open(processed_path) as img:
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        level = np.asarray(img)
+    if level.ndim == 2:
+        level = level[:, :, np.newaxis]
+
+    full_height, full_width = level.shape[:2]
+    mode = 'L' if level.shape[2] == 1 else 'RGB'
+
+    def write(array, dest):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if mode == 'L':
+            array = array[:, :, 0]
+        Image.fromarray(array, mode).save(dest, 'JPEG', quality=TILE_JPEG_QUALITY)
+
+    scale_factors = []
+    scale = 1
+    # Pillow releases the GIL while encoding, so tiles are written on threads
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = []
+        while True:
+            height, width = level.shape[:2]
+            scale_factors.append(scale)
+
+            if width <= TILE_SIZE and height <= TILE_SIZE:
+                write(level, tiles_dir / 'full' / f"{width},{height}" / '0' / 'default.jpg')
+                break
+
+            region = TILE_SIZE * scale
+            for y in range(0, height, TILE_SIZE):
+                for x in range(0, width, TILE_SIZE):
+                    tile = level[y:y + TILE_SIZE, x:x + TILE_SIZE]
+                    rx, ry = x * scale, y * scale
+                    rw = min(region, full_width - rx)
+                    rh = min(region, full_height - ry)
+                    th, tw = tile.shape[:2]
+                    dest = tiles_dir / f"{rx},{ry},{rw},{rh}" / f"{tw},{th}" / '0' / 'default.jpg'
+                    futures.append(pool.submit(write, tile, dest))
+
+            level = _downsample_2x(level, resample, memory_budget_mb)
+            scale *= 2
+
+        for future in futures:
+            future.result()
+
+    info = {
+        "@context": "http://iiif.io/api/image/3/context.json",
+        "id": f"{base_url}/iiif/objects/{object_id}",
+        "type": "ImageService3",
+        "profile": "level0",
+        "protocol": "http://iiif.io/api/image",
+        "tiles": [{"scaleFactors": scale_factors, "width": TILE_SIZE}],
+        "width": full_width,
+        "height": full_height,
+    }
+    with open(tiles_dir / 'info.json', 'w') as f:
+        dump_json(info, f, ensure_ascii=True)
+
+    # Post-processing is shared with libvips (see generate_iiif_for_image())
+
+
+@contextlib.contextmanager
+def _timed_phase(metrics, phase):
+    """Add the wall-clock time of the enclosed block to metrics['phases'][phase]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            phases = metrics.setdefault('phases', {})
+            phases[phase] = round(phases.get(phase, 0.0) + time.perf_counter() - start, 4)
+
+
+def _peak_rss_mb():
+    """Return (self, children) peak resident set size in MB, or (None, None)
+    where the resource module is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return round(own / (1024 * 1024), 1), round(children / (1024 * 1024), 1)
+
+
+def _output_stats(object_dir):
+    """Count tiles, files and bytes under an object directory.
+
+    Hardlinked files are counted once and symlinks are skipped, so bytes
+    reflects what was actually written to disk.
+    """
+    seen = set()
+    stats = {'tiles': 0, 'files': 0, 'bytes_written': 0}
+    for root, _dirs, files in os.walk(object_dir):
+        in_full = Path(root).relative_to(object_dir).parts[:1] == ('full',)
+        for name in files:
+            path = Path(root) / name
+            if path.is_symlink():
+                continue
+            stat = path.stat()
+            if (stat.st_dev, stat.st_ino) in seen:
+                continue
+            seen.add((stat.st_dev, stat.st_ino))
+            stats['files'] += 1
+            stats['bytes_written'] += stat.st_size
+            if name == 'default.jpg' and not in_full:
+                stats['tiles'] += 1
+    return stats
+
+
+def generate_iiif_for_image(image_path, output_dir, object_id, base_url, backend, options=None,
+                            metrics=None):
     """Generate IIIF tiles for a single image.
 
+    The source is decoded at most once (see preprocess_image()); the
+    tiles, full/max and the base image all come from that one file.
+
     Args:
         image_path: Path to source image
         output_dir: Output directory for this object's tiles
         object_id: Object identifier
         base_url: Base URL for the site
-        backend: 'libvips' or 'iiif'
+        backend: 'libvips', 'numpy' or 'iiif'
+        options: Optional dict of IIIF build options (see generate_iiif_tiles())
+        metrics: Optional dict; per-phase timings are added under 'phases'
     """
+    options = options or {}
     tiles_dir = output_dir
 
-    # Preprocess image (shared by both backends)
-    processed_path, temp_path = preprocess_image(image_path)
+    # Preprocess image (shared by both backends); the temp file lives next
+    # to the output so it can be moved into place instead of copied
+    with _timed_phase(metrics, 'preprocess'):
+        processed_path, temp_path = preprocess_image(
+            image_path, temp_dir=output_dir.parent,
+            memory_budget_mb=options.get('memory_budget_mb'))
 
     try:
-        if backend == 'libvips':
-            _generate_tiles_libvips(processed_path, tiles_dir, object_id, base_url)
-        else:
-            _generate_tiles_iiif(processed_path, tiles_dir, object_id, base_url)
+        with _timed_phase(metrics, 'tiles'):
+            if backend == 'libvips':
+                _generate_tiles_libvips(processed_path, tiles_dir, object_id, base_url)
+            elif backend == 'numpy':
+                _generate_tiles_numpy(processed_path, tiles_dir, object_id, base_url,
+                                      options.get('resample', 'box'),
+                                      options.get('memory_budget_mb'))
+            else:
+                _generate_tiles_iiif(processed_path, tiles_dir, object_id, base_url)
 
         # Copy base image for UniversalViewer
-        copy_base_image(processed_path, output_dir, object_id)
+        with _timed_phase(metrics, 'base_image'):
+            base_path = copy_base_image(processed_path, output_dir, object_id,
+                                        move=temp_path is not None)
+
+        if backend in ('libvips', 'numpy'):
+            if base_path:
+                with _timed_phase(metrics, 'full_max'):
+                    _generate_full_max(base_path, tiles_dir)
+                if options.get('sizes'):
+                    with _timed_phase(metrics, 'sizes'):
+                        _generate_size_ladder(base_path, tiles_dir, options['sizes'])
+            extra_formats = options.get('formats') or []
+            if extra_formats and base_path:
+                with _timed_phase(metrics, 'formats'):
+                    format_bytes = _generate_extra_formats(
+                        tiles_dir, base_path, extra_formats,
+                        options.get('encoder_quality'),
+                        options.get('encoder_effort'),
+                        options.get('memory_budget_mb'))
+                if metrics is not None:
+                    metrics['format_bytes'] = format_bytes
+            with _timed_phase(metrics, 'info_json'):
+                _patch_info_json(tiles_dir, object_id, base_url, extra_formats)
+            with _timed_phase(metrics, 'compat_dirs'):
+                _create_compat_size_dirs(tiles_dir, options.get('compat_links', 'hardlink'))
 
     finally:
         if temp_path and Path(temp_path).exists():
             Path(temp_path).unlink()
 
 
-def copy_base_image(source_image_path, output_dir, object_id):
-    """Copy full-resolution image for UniversalViewer"""
-    from PIL import Image, ImageOps
+def copy_base_image(processed_path, output_dir, object_id, move=False):
+    """Place the full-resolution image for UniversalViewer.
 
+    processed_path is already a normalized JPEG (see preprocess_image()),
+    so its bytes are used directly: a temp file is moved into place,
+    otherwise the source JPEG is copied byte for byte.
+
+    Returns:
+        Path to the base image, or None on error
+    """
     dest_path = output_dir / f"{object_id}.jpg"
 
     try:
-        img = Image.open(source_image_path)
-        img = ImageOps.exif_transpose(img) or img
-
-        if img.mode in ('RGBA', 'LA', 'P'):
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode in ('RGBA', 'LA'):
-                rgb_img.paste(img, mask=img.split()[-1])
-            img = rgb_img
-
-        img.save(dest_path, 'JPEG', quality=95)
+        if move:
+            os.replace(processed_path, dest_path)
+        else:
+            shutil.copyfile(processed_path, dest_path)
         print(f"    Copied base image")
+        return dest_path
     except Exception as e:
         print(f"    Warning: Error copying base image: {e}")
+        return None
 
 
 def create_iiif_manifest(output_dir, object_id, metadata, base_url):
-    """Create multilingual IIIF Presentation API manifest"""
+    """Create multilingual IIIF Presentation API manifest
+
+    Returns:
+        The manifest dict written to manifest.json, or None if the object
+        has no info.json
+    """
     info_path = output_dir / 'info.json'
     if not info_path.exists():
         print(f"    Warning: info.json not found, skipping manifest")
         return
 
-    with open(info_path, 'r') as f:
-        info = json.load(f)
+    info = _cached_load(info_path, _load_json)
 
     width = info.get('width', 0)
     height = info.get('height', 0)
@@ -1120,7 +3095,7 @@ def create_iiif_manifest(output_dir, object_id, metadata, base_url):
 
     manifest = {
         "@context": "http://iiif.io/api/presentation/3/context.json",
-        "id": f"{base_url}/iiif/objects/{object_id}/manifest.json",
+        "id": iiif_manifest_url(base_url, object_id),
         "type": "Manifest",
         "label": label,
         "metadata": [],
@@ -1200,25 +3175,350 @@ def create_iiif_manifest(output_dir, object_id, metadata, base_url):
 
     manifest_path = output_dir / 'manifest.json'
     with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        dump_json(manifest, f)
 
     print(f"    Created multilingual manifest.json")
 
+    return manifest
+
+
+def _sha256_file(path):
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sha256_json(value):
+    """Return the hex SHA-256 digest of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def load_iiif_build_state():
+    """
+    Read iiif/build-state.json.
+
+    Returns:
+        Dict mapping object_id to its recorded build inputs (empty if the
+        file is missing or unreadable)
+    """
+    if not IIIF_BUILD_STATE_PATH.exists():
+        return {}
+    try:
+        with open(IIIF_BUILD_STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read {IIIF_BUILD_STATE_PATH}: {e}")
+        return {}
+    return state.get('objects', {})
+
+
+def save_iiif_build_state(objects_state):
+    """Write iiif/build-state.json with one entry per object."""
+    state = {
+        "generator": GENERATOR_VERSION,
+        "objects": {object_id: objects_state[object_id] for object_id in sorted(objects_state)},
+    }
+    with open(IIIF_BUILD_STATE_PATH, 'w', encoding='utf-8') as f:
+        dump_json(state, f)
+        f.write('\n')
+
+
+def _tile_output_options(options, backend=None):
+    """Return the build options that change tile output, omitting defaults.
+
+    Defaults are left out so that state recorded before an option existed
+    still matches a build that does not use it. The backend counts as
+    default when it is the preferred one (TILE_BACKENDS[0]); resample is
+    only recorded for the numpy backend, the only one that uses it, and
+    sizes and formats not at all for the iiif backend, which writes
+    neither.
+    """
+    options = options or {}
+    output_options = {}
+    if backend and backend != TILE_BACKENDS[0]:
+        output_options['backend'] = backend
+    if backend == 'numpy' and options.get('resample', 'box') != 'box':
+        output_options['resample'] = options['resample']
+    if backend == 'iiif':
+        return output_options
+    if options.get('sizes'):
+        output_options['sizes'] = sorted(options['sizes'])
+    if options.get('formats'):
+        output_options['formats'] = sorted(options['formats'])
+        output_options['encoder_quality'] = options.get('encoder_quality') or DEFAULT_ENCODER_QUALITY
+        output_options['encoder_effort'] = options.get('encoder_effort', DEFAULT_ENCODER_EFFORT)
+    return output_options
+
+
+def iiif_build_inputs(obj, image_path, base_url, previous=None, options=None, backend=None):
+    """
+    Describe the inputs an object's IIIF output is built from.
+
+    The source image is hashed by content. When its size and mtime match
+    the previous entry the recorded hash is reused instead of re-reading
+    the file.
+
+    Args:
+        obj: Object row from read_iiif_objects_csv()
+        image_path: Path to the source image
+        base_url: Base URL written into info.json and the manifest
+        previous: Entry recorded by the last build, if any
+        options: IIIF build options (see generate_iiif_tiles())
+        backend: Tile backend the object is built with
+
+    Returns:
+        Dict suitable for storing in iiif/build-state.json
+    """
+    stat = image_path.stat()
+    previous = previous or {}
+    if (previous.get('source_size') == stat.st_size
+            and previous.get('source_mtime_ns') == stat.st_mtime_ns
+            and previous.get('source_sha256')):
+        source_hash = previous['source_sha256']
+    else:
+        source_hash = _sha256_file(image_path)
+
+    entry = {
+        'source_sha256': source_hash,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'metadata_sha256': _sha256_json(obj),
+        'base_url': base_url,
+        'generator': GENERATOR_VERSION,
+    }
+    output_options = _tile_output_options(options, backend)
+    if output_options:
+        entry['options'] = output_options
+    return entry
+
+
+def _adoptable_output(object_output, object_id, base_url, current):
+    """
+    True if existing output without build state provably matches the inputs.
+
+    Output is only adopted into the build state when info.json carries the
+    id the current base URL gives it, and the base image is byte-identical
+    to the source (the case for JPEG sources, which are used as-is).
+    Anything else, including output whose base image was re-encoded from a
+    PNG or TIFF, cannot be checked and is rebuilt.
+    """
+    try:
+        with open(object_output / 'info.json', 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    except Exception:
+        return False
+    if (info.get('id') or info.get('@id')) != f"{base_url}/iiif/objects/{object_id}":
+        return False
+    base_image = object_output / f"{object_id}.jpg"
+    return base_image.exists() and _sha256_file(base_image) == current['source_sha256']
+
+
+def _tile_inputs_changed(previous, current):
+    """True if anything that affects tiles or info.json differs."""
+    return any(previous.get(key) != current.get(key)
+               for key in ('source_sha256', 'base_url', 'generator', 'options'))
+
+
+def process_iiif_object(obj, output_dir, base_url, backend, force=False, previous=None,
+                        options=None, metrics=None, validation=None):
+    """
+    Run the full IIIF pipeline (tiles, base image, manifest) for one object.
+
+    Tiles are rebuilt only when the source image, base URL or generator
+    version differ from the recorded build state; if only the CSV metadata
+    changed, just the manifest is rewritten. Objects with existing output
+    but no recorded state are adopted only if it can be shown to match the
+    current source and base URL (see _adoptable_output()) and no
+    non-default output options are requested; otherwise they are rebuilt.
+
+    Progress is printed as it happens; callers that need the log for later
+    (e.g. worker processes) capture stdout around this call.
 
-def generate_iiif_tiles(base_url=None, force=False):
+    Args:
+        previous: Build-state entry recorded for this object, or None
+        options: Optional dict of IIIF build options (see generate_iiif_tiles())
+        metrics: Optional dict filled with phase timings, peak memory and
+                 output statistics for this object
+        validation: Optional dict; a manifest written by this call is
+                    validated in memory and its errors (see
+                    validate_iiif_manifest()) stored under the object_id
+
+    Returns:
+        Tuple of (status, state_entry). status is 'processed', 'manifest',
+        'skipped' or 'failed'; state_entry is the entry to record (None to
+        drop it).
+    """
+    started = time.perf_counter()
+    status, entry = _run_iiif_object(obj, output_dir, base_url, backend, force,
+                                     previous, options, metrics, validation)
+    if metrics is not None:
+        metrics['object_id'] = obj['object_id']
+        metrics['status'] = status
+        metrics['seconds'] = round(time.perf_counter() - started, 4)
+        metrics['peak_rss_mb'], metrics['children_peak_rss_mb'] = _peak_rss_mb()
+        object_output = output_dir / obj['object_id']
+        if status == 'processed' and object_output.exists():
+            metrics.update(_output_stats(object_output))
+    return status, entry
+
+
+def _write_manifest(object_output, object_id, obj, base_url, metrics, validation):
+    """Create an object's manifest and, if requested, validate it in memory."""
+    with _timed_phase(metrics, 'manifest'):
+        manifest = create_iiif_manifest(object_output, object_id, obj, base_url)
+    if validation is not None and manifest is not None:
+        with _timed_phase(metrics, 'validate'):
+            validation[object_id] = validate_iiif_manifest(manifest)
+
+
+def _run_iiif_object(obj, output_dir, base_url, backend, force, previous, options, metrics,
+                     validation=None):
+    """Pipeline behind process_iiif_object(); see there for arguments."""
+    object_id = obj['object_id']
+    source_image = obj['source_image']
+
+    # Find source image
+    image_path = IIIF_DIR / source_image
+    if not image_path.exists():
+        print(f"    Warning: Source image not found: {image_path}")
+        return 'skipped', previous
+
+    print(f"    Found: {image_path.name}")
+
+    # Output directory for this object
+    object_output = output_dir / object_id
+    info_json = object_output / "info.json"
+
+    try:
+        with _timed_phase(metrics, 'hash_inputs'):
+            current = iiif_build_inputs(obj, image_path, base_url, previous, options, backend)
+
+        if info_json.exists() and not force:
+            if previous is None and 'options' not in current:
+                # Built before build-state existed, with default options
+                if _adoptable_output(object_output, object_id, base_url, current):
+                    # The manifest cannot be checked the same way, so it is rewritten
+                    print(f"    Existing tiles match the source, adopted into build state; "
+                          f"rewriting manifest")
+                    _write_manifest(object_output, object_id, obj, base_url, metrics, validation)
+                    return 'manifest', current
+                print(f"    No build state and existing tiles cannot be verified, regenerating")
+            if previous is not None and not _tile_inputs_changed(previous, current):
+                if previous.get('metadata_sha256') == current['metadata_sha256']:
+                    print(f"    Skipping (unchanged, use --force to regenerate)")
+                    return 'skipped', current
+                print(f"    Metadata changed, rewriting manifest only")
+                _write_manifest(object_output, object_id, obj, base_url, metrics, validation)
+                return 'manifest', current
+            print(f"    Source image or settings changed, regenerating")
+
+        # Remove existing output if regenerating
+        if object_output.exists():
+            shutil.rmtree(object_output)
+        object_output.mkdir(parents=True, exist_ok=True)
+
+        # Generate tiles
+        generate_iiif_for_image(image_path, object_output, object_id, base_url, backend, options,
+                                metrics)
+
+        # Create manifest with metadata
+        _write_manifest(object_output, object_id, obj, base_url, metrics, validation)
+
+        print(f"    Generated tiles for {object_id}")
+        return 'processed', current
+
+    except Exception as e:
+        print(f"    Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 'failed', None
+
+
+def _process_iiif_object_worker(args):
+    """Process pool entry point: run process_iiif_object() with captured output.
+
+    The last two elements of args say whether to validate the manifest
+    and whether to collect metrics.
+
+    Returns:
+        Tuple of (status, state_entry, metrics, validation, captured_log)
+    """
+    *args, validate, measure = args
+    log = io.StringIO()
+    metrics = {} if measure else None
+    validation = {} if validate else None
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        status, entry = process_iiif_object(*args, metrics=metrics, validation=validation)
+    return status, entry, metrics, validation, log.getvalue()
+
+
+def generate_iiif_tiles(base_url=None, force=False, jobs=1, memory_budget_mb=None,
+                        backend=None, resample='box', compat_links='hardlink', sizes=None,
+                        formats=None, encoder_quality=None, encoder_effort=None,
+                        metrics_out=None, validation=None):
     """
     Generate IIIF tiles for all objects in iiif/all-demo-objects.csv
 
-    By default, skips objects that already have tiles (info.json exists).
-    Use force=True to regenerate all tiles.
+    By default, only objects whose inputs changed since the last build
+    (see iiif/build-state.json) are regenerated. Use force=True to
+    regenerate all tiles.
+
+    With jobs > 1, objects are processed concurrently in a process pool.
+    Each object's log is buffered in its worker and printed in CSV order,
+    so the output reads the same as a serial run.
+
+    memory_budget_mb caps preprocessing memory per object (see
+    preprocess_image()); with jobs > 1 each worker gets this budget.
+
+    backend selects a tile backend ('libvips', 'numpy' or 'iiif') instead
+    of auto-detecting one; resample picks the NumPy backend's downsampling
+    filter ('box' or 'lanczos'). compat_links controls how the IIIF 2.x
+    full/w, aliases are created (see _create_compat_size_dirs()). sizes is
+    a list of extra full/ widths to pre-render (see _generate_size_ladder()).
+    formats lists extra tile encodings ('webp', 'avif') written alongside
+    the JPEGs at encoder_quality / encoder_effort.
+
+    metrics_out, if given, is a path for a JSON report with per-object
+    phase timings, peak memory, tile counts and bytes written (see
+    write_iiif_metrics()).
+
+    validation, if given, is a dict filled with object_id -> errors for
+    every manifest written in this run, validated in memory straight
+    after it is built (see validate_iiif_manifest()), so that
+    validate_all_iiif_manifests() need not read them back.
     """
-    backend = check_iiif_dependencies()
+    backend = check_iiif_dependencies(backend)
     if not backend:
         return False
 
     if not base_url:
         base_url = DEFAULT_BASE_URL
 
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, jobs)
+
+    # Options passed down to every object (and every worker)
+    options = {
+        'memory_budget_mb': memory_budget_mb or DEFAULT_MEMORY_BUDGET_MB,
+        'resample': resample,
+        'compat_links': compat_links,
+        'sizes': DEFAULT_SIZE_LADDER if sizes is None else sizes,
+        'formats': available_extra_formats(formats or []),
+        'encoder_quality': encoder_quality or DEFAULT_ENCODER_QUALITY,
+        'encoder_effort': DEFAULT_ENCODER_EFFORT if encoder_effort is None else encoder_effort,
+    }
+    if backend == 'iiif':
+        # iiif_static writes neither a size ladder nor extra formats
+        if sizes or formats:
+            print("Warning: --sizes and --formats are not supported by the iiif tile backend; ignoring them")
+        options['sizes'] = []
+        options['formats'] = []
+
     sources_dir = IIIF_DIR / "sources"
     output_dir = IIIF_DIR / "objects"
 
@@ -1235,6 +3535,13 @@ def generate_iiif_tiles(base_url=None, force=False):
     print(f"Output: {output_dir}")
     print(f"Base URL: {base_url}")
     print(f"Backend: {backend}" + (" (recommended)" if backend == 'libvips' else " (fallback)"))
+    if backend == 'numpy':
+        print(f"Resample: {resample}")
+    if options['formats']:
+        print(f"Extra formats: {', '.join(options['formats'])} "
+              f"(quality {options['encoder_quality']}, effort {options['encoder_effort']})")
+    if jobs > 1:
+        print(f"Jobs: {jobs}")
     print("=" * 60)
     print()
 
@@ -1249,68 +3556,113 @@ def generate_iiif_tiles(base_url=None, force=False):
 
     print(f"Found {len(objects)} objects to process\n")
 
-    processed = 0
-    skipped = 0
-
-    for i, obj in enumerate(objects, 1):
-        object_id = obj['object_id']
-        source_image = obj['source_image']
-
-        print(f"[{i}/{len(objects)}] Processing {object_id}...")
-
-        # Find source image
-        image_path = IIIF_DIR / source_image
-        if not image_path.exists():
-            print(f"    Warning: Source image not found: {image_path}")
-            skipped += 1
-            continue
-
-        print(f"    Found: {image_path.name}")
-
-        # Output directory for this object
-        object_output = output_dir / object_id
-
-        # Check if already generated (skip unless --force)
-        info_json = object_output / "info.json"
-        if info_json.exists() and not force:
-            print(f"    Skipping (already exists, use --force to regenerate)")
-            skipped += 1
-            continue
-
-        try:
-            # Remove existing output if regenerating
-            if object_output.exists():
-                shutil.rmtree(object_output)
-            object_output.mkdir(parents=True, exist_ok=True)
-
-            # Generate tiles
-            generate_iiif_for_image(image_path, object_output, object_id, base_url, backend)
-
-            # Create manifest with metadata
-            create_iiif_manifest(object_output, object_id, obj, base_url)
-
-            print(f"    Generated tiles for {object_id}")
-            processed += 1
-
-        except Exception as e:
-            print(f"    Error: {e}")
-            import traceback
-            traceback.print_exc()
-            skipped += 1
-
-        print()
+    previous_state = load_iiif_build_state()
+    build_state = {}
+    counts = {'processed': 0, 'manifest': 0, 'skipped': 0, 'failed': 0}
+    object_metrics = []
+    total = len(objects)
+    run_started = time.perf_counter()
+
+    def record(obj, status, entry, metrics):
+        counts[status] += 1
+        if entry is not None:
+            build_state[obj['object_id']] = entry
+        if metrics is not None:
+            object_metrics.append(metrics)
+        if status != 'skipped':
+            print()
+
+    if jobs == 1:
+        for i, obj in enumerate(objects, 1):
+            print(f"[{i}/{total}] Processing {obj['object_id']}...")
+            # Timings, RSS and an output walk are only gathered for --metrics-out
+            metrics = {} if metrics_out else None
+            status, entry = process_iiif_object(
+                obj, output_dir, base_url, backend, force,
+                previous_state.get(obj['object_id']), options, metrics, validation)
+            record(obj, status, entry, metrics)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool_args = {'max_workers': min(jobs, total)}
+        if metrics_out and sys.version_info >= (3, 11):
+            # A fresh worker per object makes peak RSS a per-object figure
+            pool_args['max_tasks_per_child'] = 1
+
+        work = [(obj, output_dir, base_url, backend, force,
+                 previous_state.get(obj['object_id']), options, validation is not None,
+                 bool(metrics_out))
+                for obj in objects]
+        with ProcessPoolExecutor(**pool_args) as executor:
+            # map() yields results in submission order, keeping logs ordered
+            results = executor.map(_process_iiif_object_worker, work)
+            for i, (obj, (status, entry, metrics, object_validation, log)) in enumerate(
+                    zip(objects, results), 1):
+                print(f"[{i}/{total}] Processing {obj['object_id']}...")
+                print(log, end='')
+                record(obj, status, entry, metrics)
+                if object_validation:
+                    validation.update(object_validation)
+
+    save_iiif_build_state(build_state)
 
     print("=" * 60)
     print("IIIF generation complete!")
-    print(f"  Processed: {processed} objects")
-    if skipped > 0:
-        print(f"  Skipped: {skipped} objects")
+    print(f"  Processed: {counts['processed']} objects")
+    if counts['manifest'] > 0:
+        print(f"  Manifests updated: {counts['manifest']} objects")
+    if counts['skipped'] > 0:
+        print(f"  Skipped: {counts['skipped']} objects")
+    if counts['failed'] > 0:
+        print(f"  Failed: {counts['failed']} objects")
     print(f"  Output: {output_dir}")
     print("=" * 60)
 
+    if metrics_out:
+        write_iiif_metrics(metrics_out, object_metrics, counts, backend, jobs, options,
+                           time.perf_counter() - run_started)
+
     return True
 
 
+def write_iiif_metrics(path, object_metrics, counts, backend, jobs, options, seconds):
+    """
+    Write the IIIF stage metrics report as JSON.
+
+    One entry per object with its status, wall time, per-phase timings,
+    peak RSS (of the process that built it; with jobs == 1 this is the
+    high-water mark of the whole run so far) and, for rebuilt objects,
+    tile count, file count and bytes written.
+    """
+    phase_totals = {}
+    for metrics in object_metrics:
+        for phase, value in metrics.get('phases', {}).items():
+            phase_totals[phase] = round(phase_totals.get(phase, 0.0) + value, 4)
+
+    report = {
+        "generator": GENERATOR_VERSION,
+        "generated": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        "backend": backend,
+        "jobs": jobs,
+        "options": options,
+        "seconds": round(seconds, 4),
+        "counts": counts,
+        "totals": {
+            "phases": phase_totals,
+            "tiles": sum(m.get('tiles', 0) for m in object_metrics),
+            "files": sum(m.get('files', 0) for m in object_metrics),
+            "bytes_written": sum(m.get('bytes_written', 0) for m in object_metrics),
+        },
+        "objects": object_metrics,
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        dump_json(report, f)
+    print(f"Metrics written to: {path}")
+
+
 # =============================================================================
 # IIIF MANIFEST VALIDATION
 # =============================================================================
@@ -1326,39 +3678,74 @@ def check_validation_dependencies():
         return False
 
 
-def validate_iiif_manifest(manifest_path):
-    """Validate a IIIF manifest against the Presentation API 3.0 schema"""
+# Compiled manifest validator, built once per process (see _manifest_validator())
+_MANIFEST_VALIDATOR = None
+
+
+def _manifest_validator():
+    """
+    Return a Draft 7 validator for the Presentation API 3.0 Manifest class.
+
+    The schema is read and the validator compiled on first use, then
+    reused for every manifest validated in this process. The schema
+    defines its classes under "classes" (e.g. classes.manifest), with
+    internal #/classes/... references, so the validator is built from the
+    whole schema with a root $ref to the manifest class.
+
+    Returns:
+        The validator, or None if the schema is missing or has no Manifest
+        class (a warning is printed once)
+    """
+    global _MANIFEST_VALIDATOR
+    if _MANIFEST_VALIDATOR is not None:
+        return _MANIFEST_VALIDATOR or None
+
     import jsonschema
 
+    _MANIFEST_VALIDATOR = False
     schema_path = SCRIPT_DIR / "schemas" / "iiif_3_0.json"
-
     if not schema_path.exists():
         print(f"    Warning: Schema not found at {schema_path}")
         return None
 
-    try:
-        with open(schema_path, 'r') as f:
-            schema = json.load(f)
+    with open(schema_path, 'r') as f:
+        schema = json.load(f)
+
+    classes = schema.get("classes", {})
+    class_name = next((name for name in ("manifest", "Manifest") if name in classes), None)
+    if class_name is None:
+        print("    Warning: Could not find Manifest schema definition")
+        return None
 
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+    # Draft 7 ignores keywords next to $ref, so the root validates
+    # against the manifest class while #/classes/... refs still resolve
+    root = {key: value for key, value in schema.items() if key != "oneOf"}
+    root["$ref"] = f"#/classes/{class_name}"
+    _MANIFEST_VALIDATOR = jsonschema.Draft7Validator(root)
+    return _MANIFEST_VALIDATOR
 
-        # The IIIF schema uses a custom structure with "classes" for validation
-        # We need to validate against the Manifest class definition
-        manifest_schema = schema.get("classes", {}).get("Manifest", {})
 
-        if not manifest_schema:
-            print("    Warning: Could not find Manifest schema definition")
-            return None
+def validate_iiif_manifest(manifest):
+    """
+    Validate a IIIF manifest against the Presentation API 3.0 schema.
+
+    Args:
+        manifest: Manifest dict, or path to a manifest.json file
 
-        # Create a resolver for internal $ref references
-        resolver = jsonschema.RefResolver.from_schema(schema)
+    Returns:
+        List of error message strings (empty if valid), or None if the
+        schema could not be used
+    """
+    try:
+        validator = _manifest_validator()
+        if validator is None:
+            return None
 
-        # Validate
-        validator = jsonschema.Draft7Validator(manifest_schema, resolver=resolver)
-        errors = list(validator.iter_errors(manifest))
+        if not isinstance(manifest, dict):
+            with open(manifest, 'r') as f:
+                manifest = json.load(f)
 
-        return errors
+        return [err.message for err in validator.iter_errors(manifest)]
 
     except json.JSONDecodeError as e:
         return [f"Invalid JSON: {e}"]
@@ -1366,8 +3753,25 @@ def validate_iiif_manifest(manifest_path):
         return [f"Validation error: {e}"]
 
 
-def validate_all_iiif_manifests():
-    """Validate all generated IIIF manifests"""
+def _validate_manifest_worker(manifest_path):
+    """Process pool entry point: validate one manifest file with captured output."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        errors = validate_iiif_manifest(manifest_path)
+    return errors, log.getvalue()
+
+
+def validate_all_iiif_manifests(validated=None, jobs=1):
+    """
+    Validate all generated IIIF manifests.
+
+    Args:
+        validated: Optional dict of object_id -> errors for manifests
+                   already validated in memory during this run (see
+                   generate_iiif_tiles()); those are not read back
+        jobs: Number of worker processes for the remaining manifests
+              (0 = all CPUs); each worker compiles the validator once
+    """
     if not check_validation_dependencies():
         return True  # Skip validation but don't fail
 
@@ -1379,40 +3783,53 @@ def validate_all_iiif_manifests():
     print("\n[IIIF Manifest Validation]")
     print("-" * 40)
 
-    all_valid = True
-    validated = 0
-    failed = 0
-
+    validated = validated or {}
+    manifests = []
     for object_dir in sorted(objects_dir.iterdir()):
-        if not object_dir.is_dir():
-            continue
+        if object_dir.is_dir() and (object_dir / "manifest.json").exists():
+            manifests.append((object_dir.name, object_dir / "manifest.json"))
+
+    pending = [path for object_id, path in manifests if object_id not in validated]
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(pending)))
+
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_manifest_validator) as executor:
+            results = list(executor.map(_validate_manifest_worker, pending,
+                                        chunksize=max(1, len(pending) // (jobs * 4))))
+    else:
+        results = [_validate_manifest_worker(path) for path in pending]
+    from_disk = dict(zip(pending, results))
 
-        manifest_path = object_dir / "manifest.json"
-        if not manifest_path.exists():
-            continue
+    all_valid = True
+    validated_count = 0
+    failed = 0
 
-        object_id = object_dir.name
-        errors = validate_iiif_manifest(manifest_path)
+    for object_id, manifest_path in manifests:
+        if object_id in validated:
+            errors = validated[object_id]
+        else:
+            errors, log = from_disk[manifest_path]
+            print(log, end='')
 
         if errors is None:
             print(f"  {object_id}: Skipped (schema issue)")
         elif len(errors) == 0:
             print(f"  {object_id}: Valid")
-            validated += 1
+            validated_count += 1
         else:
             print(f"  {object_id}: INVALID ({len(errors)} errors)")
             for err in errors[:3]:  # Show first 3 errors
-                if hasattr(err, 'message'):
-                    print(f"    - {err.message}")
-                else:
-                    print(f"    - {err}")
+                print(f"    - {err}")
             if len(errors) > 3:
                 print(f"    ... and {len(errors) - 3} more errors")
             failed += 1
             all_valid = False
 
     print("-" * 40)
-    print(f"Validated: {validated}, Failed: {failed}")
+    print(f"Validated: {validated_count}, Failed: {failed}")
 
     return all_valid
 
@@ -1421,12 +3838,112 @@ def validate_all_iiif_manifests():
 # VERSIONS INDEX GENERATION
 # =============================================================================
 
+# Keyed sections of a bundle that delta artifacts diff entry by entry
+DELTA_SECTIONS = ('objects', 'stories', 'glossary', 'texts')
+DELTA_FORMAT_VERSION = "0.1"
+
+
+def bundle_delta(old_bundle, new_bundle):
+    """
+    Compute the changes that turn old_bundle into new_bundle.
+
+    For each of objects, stories, glossary and texts (if either bundle
+    has that section), entries are listed as added, changed (both with
+    their new value) or removed (keys only).
+    Other top-level sections (project, iiif_base_url) are included under
+    "replace" only if they differ. new_bundle's _meta is carried as
+    "bundle_meta" so the patched bundle is complete.
+    """
+    delta = {"bundle_meta": new_bundle.get('_meta', {}), "replace": {}}
+
+    for section in DELTA_SECTIONS:
+        if section not in old_bundle and section not in new_bundle:
+            continue
+        old = old_bundle.get(section, {})
+        new = new_bundle.get(section, {})
+        delta[section] = {
+            "added": {key: new[key] for key in new if key not in old},
+            "changed": {key: new[key] for key in new if key in old and old[key] != new[key]},
+            "removed": [key for key in old if key not in new],
+        }
+
+    for key, value in new_bundle.items():
+        if key != '_meta' and key not in DELTA_SECTIONS and old_bundle.get(key) != value:
+            delta["replace"][key] = value
+
+    return delta
+
+
+def generate_bundle_deltas(versions):
+    """
+    Write delta artifacts between consecutive versions, per language.
+
+    For each pair of consecutive versions and each language that has a
+    bundle in both, writes
+    demos/v<new>/<lang>/telar-demo-delta-from-<old>.json (see
+    bundle_delta()). The delta records the SHA-256 of both bundle files
+    so a client can check it holds the right base. Files are only
+    rewritten when their content changes.
+
+    Args:
+        versions: Version strings, oldest first
+
+    Returns:
+        Dict mapping each newer version to {"from": old_version,
+        "languages": {lang: path relative to demos/}}
+    """
+    index = {}
+    for old_version, new_version in zip(versions, versions[1:]):
+        languages = {}
+        for lang_dir in _language_dirs(DEMOS_DIR / f"v{new_version}"):
+            new_path = lang_dir / "telar-demo-bundle.json"
+            old_path = DEMOS_DIR / f"v{old_version}" / lang_dir.name / "telar-demo-bundle.json"
+            if not new_path.exists() or not old_path.exists():
+                continue
+            try:
+                with open(old_path, 'r', encoding='utf-8') as f:
+                    old_bundle = json.load(f)
+                with open(new_path, 'r', encoding='utf-8') as f:
+                    new_bundle = json.load(f)
+            except Exception as e:
+                print(f"  Warning: Could not diff {old_path} and {new_path}: {e}")
+                continue
+
+            delta = {
+                "_meta": {
+                    "delta_format": DELTA_FORMAT_VERSION,
+                    "language": lang_dir.name,
+                    "from_version": old_version,
+                    "to_version": new_version,
+                    "from_sha256": _sha256_file(old_path),
+                    "to_sha256": _sha256_file(new_path),
+                    "generator": f"telar-demo-content/build-demos.py v{GENERATOR_VERSION}",
+                },
+                **bundle_delta(old_bundle, new_bundle),
+            }
+            delta_path = lang_dir / f"telar-demo-delta-from-{old_version}.json"
+            encoded = dumps_json(delta).encode('utf-8')
+            _write_if_changed(delta_path, encoded)
+            languages[lang_dir.name] = delta_path.relative_to(DEMOS_DIR).as_posix()
+
+            changes = sum(len(delta[section][kind]) for section in DELTA_SECTIONS
+                          if section in delta for kind in ('added', 'changed', 'removed'))
+            print(f"  Delta {old_version} -> {new_version} [{lang_dir.name}]: "
+                  f"{changes} entries changed, {len(encoded):,} bytes")
+
+        if languages:
+            index[new_version] = {"from": old_version, "languages": languages}
+    return index
+
+
 def generate_versions_index():
     """
     Generate demos/versions.json by scanning existing version directories.
 
     Scans the demos/ directory for version folders (v0.6.0, v0.7.0, etc.)
-    and writes a versions.json index file.
+    and writes a versions.json index file. Delta artifacts between
+    consecutive versions are regenerated and listed under "deltas" (see
+    generate_bundle_deltas()).
 
     Returns:
         bool: True if successful, False otherwise
@@ -1455,23 +3972,19 @@ def generate_versions_index():
         return False
 
     # Sort versions semantically
-    def parse_version(v):
-        try:
-            parts = v.split('.')
-            return tuple(int(p) for p in parts)
-        except ValueError:
-            return (0, 0, 0)
+    version_dirs.sort(key=_parse_version)
 
-    version_dirs.sort(key=parse_version)
+    print(f"\n[Versions Index]")
+    deltas = generate_bundle_deltas(version_dirs)
 
     # Write versions.json
     versions_data = {"versions": version_dirs}
+    if deltas:
+        versions_data["deltas"] = deltas
     versions_path = DEMOS_DIR / "versions.json"
 
-    with open(versions_path, 'w', encoding='utf-8') as f:
-        json.dump(versions_data, f, indent=2, ensure_ascii=False)
+    _atomic_write(versions_path, lambda f: dump_json(versions_data, f))
 
-    print(f"\n[Versions Index]")
     print(f"  Versions found: {', '.join(version_dirs)}")
     print(f"  Written to: {versions_path}")
 
@@ -1482,6 +3995,14 @@ def generate_versions_index():
 # MAIN
 # =============================================================================
 
+def _parse_int_list(value):
+    """argparse type for comma-separated integers (e.g. '400,1000')."""
+    try:
+        return [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got '{value}'")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate demo bundles and IIIF tiles for Telar demo content",
@@ -1490,16 +4011,69 @@ def main():
 Examples:
     python build-demos.py --version 0.6.0              # Generate both bundle and IIIF
     python build-demos.py --version 0.6.0 --bundle-only  # Just demo bundle
-    python build-demos.py --iiif-only                  # Just IIIF tiles (skips existing)
+    python build-demos.py --iiif-only                  # Just IIIF tiles (skips unchanged)
     python build-demos.py --iiif-only --force          # Regenerate all IIIF tiles
+    python build-demos.py --iiif-only --force -j 8     # Regenerate using 8 worker processes
+    python build-demos.py --all-versions --bundle-only -j 0  # Rebuild every bundle in parallel
         """
     )
     parser.add_argument("--version", "-v", help="Telar version (e.g., 0.6.0)")
+    parser.add_argument("--all-versions", action="store_true",
+                        help="Generate bundles for every demos/v*/<lang> directory")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="Write byte-reproducible bundles: sorted keys, timestamp from "
+                             "SOURCE_DATE_EPOCH or the newest input, and a content hash")
+    parser.add_argument("--compress", action="store_true",
+                        help="Also write minified .json.gz/.json.br bundle siblings, for a deploy "
+                             "to a host that serves precompressed files")
+    parser.add_argument("--dedupe-texts", action="store_true",
+                        help="Store each distinct layer body once in a bundle-level texts "
+                             "table referenced by hash")
+    parser.add_argument("--render-html", action="store_true",
+                        help="Add pre-rendered HTML (content_html) to layers and glossary "
+                             "entries, cached in generator/.cache/")
+    parser.add_argument("--schema-check", action="store_true",
+                        help="Also check each bundle against generator/schemas/telar_bundle_0_2.json "
+                             "(slower; needs jsonschema)")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Also write telar-demo-index.json with content-addressed story, "
+                             "object and glossary shards")
     parser.add_argument("--bundle-only", action="store_true", help="Generate only demo bundle")
     parser.add_argument("--iiif-only", action="store_true", help="Generate only IIIF tiles")
     parser.add_argument("--base-url", help=f"Base URL for IIIF (default: {DEFAULT_BASE_URL})")
     parser.add_argument("--skip-validation", action="store_true", help="Skip IIIF manifest validation")
-    parser.add_argument("--force", action="store_true", help="Force regenerate IIIF tiles even if they exist")
+    parser.add_argument("--force", action="store_true", help="Regenerate IIIF tiles and bundles even if their inputs are unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes for IIIF tiling and --all-versions "
+                             "bundles (default: 1, 0 = all CPUs)")
+    parser.add_argument("--tile-backend", choices=TILE_BACKENDS,
+                        help="IIIF tile backend (default: first available of libvips, numpy, iiif)")
+    parser.add_argument("--resample", choices=['box', 'lanczos'], default='box',
+                        help="Downsampling filter for the numpy tile backend (default: box)")
+    parser.add_argument("--compat-links", choices=['hardlink', 'symlink', 'copy'], default='hardlink',
+                        help="How IIIF 2.x full/w, size aliases are created (default: hardlink)")
+    parser.add_argument("--dedup-iiif", action="store_true",
+                        help="Deduplicate identical files in iiif/objects/ using --compat-links mode")
+    parser.add_argument("--sizes", type=_parse_int_list, metavar="W1,W2,...",
+                        help="Extra full/ widths to pre-render and list in info.json sizes "
+                             "(e.g. 400,1000)")
+    parser.add_argument("--formats", type=lambda v: [f.strip() for f in v.split(',') if f.strip()],
+                        metavar="FMT,...",
+                        help=f"Extra tile encodings written alongside JPEG "
+                             f"({', '.join(EXTRA_TILE_FORMATS)}); advertised in info.json extraFormats")
+    parser.add_argument("--encoder-quality", type=int,
+                        help=f"Quality for --formats encoders (default: {DEFAULT_ENCODER_QUALITY})")
+    parser.add_argument("--encoder-effort", type=int, choices=range(0, 7), metavar="0-6",
+                        help=f"Encoder effort for --formats, 0 fastest to 6 smallest "
+                             f"(default: {DEFAULT_ENCODER_EFFORT})")
+    parser.add_argument("--metrics-out", metavar="PATH",
+                        help="Write per-object IIIF timing, memory and size metrics as JSON")
+    parser.add_argument("--thumbnail-width", type=int, default=DEFAULT_THUMBNAIL_WIDTH,
+                        help="Bundle thumbnails use the smallest info.json size at least this "
+                             f"wide (default: {DEFAULT_THUMBNAIL_WIDTH})")
+    parser.add_argument("--memory-budget", type=int, metavar="MB",
+                        help=f"Per-object preprocessing memory budget; larger images are "
+                             f"streamed through libvips (default: {DEFAULT_MEMORY_BUDGET_MB})")
 
     args = parser.parse_args()
 
@@ -1511,8 +4085,24 @@ Examples:
         print("Error: Cannot use both --iiif-only and --bundle-only")
         sys.exit(1)
 
-    if not args.iiif_only and not args.version:
-        print("Error: --version is required unless using --iiif-only")
+    if args.version and args.all_versions:
+        print("Error: Cannot use both --version and --all-versions")
+        sys.exit(1)
+
+    if args.iiif_only and args.all_versions:
+        print("Error: Cannot use both --iiif-only and --all-versions")
+        sys.exit(1)
+
+    if not args.iiif_only and not args.version and not args.all_versions:
+        print("Error: --version or --all-versions is required unless using --iiif-only")
+        sys.exit(1)
+
+    if args.dedup_iiif and args.compat_links == 'copy':
+        print("Error: --dedup-iiif needs --compat-links hardlink or symlink, not copy")
+        sys.exit(1)
+
+    if args.render_html and not MARKDOWN_AVAILABLE:
+        print("Error: --render-html requires the markdown package (pip install markdown)")
         sys.exit(1)
 
     success = True
@@ -1520,22 +4110,56 @@ Examples:
     # Generate IIIF if not bundle-only
     if not args.bundle_only:
         print("\n[IIIF Generation]")
-        if not generate_iiif_tiles(base_url=args.base_url, force=args.force):
+        # Manifests written in this run are validated in memory as they are built
+        validation = {} if not args.skip_validation and check_validation_dependencies() else None
+        if not generate_iiif_tiles(base_url=args.base_url, force=args.force, jobs=args.jobs,
+                                   memory_budget_mb=args.memory_budget,
+                                   backend=args.tile_backend, resample=args.resample,
+                                   compat_links=args.compat_links, sizes=args.sizes,
+                                   formats=args.formats, encoder_quality=args.encoder_quality,
+                                   encoder_effort=args.encoder_effort,
+                                   metrics_out=args.metrics_out, validation=validation):
             success = False
 
+        if args.dedup_iiif:
+            dedup_iiif_objects(args.compat_links)
+
         # Validate IIIF manifests unless skipped
         if not args.skip_validation:
-            if not validate_all_iiif_manifests():
+            if not validate_all_iiif_manifests(validated=validation, jobs=args.jobs):
                 success = False
 
     # Generate bundle if not iiif-only
     if not args.iiif_only:
-        print(f"\n[Bundle Generation for v{args.version}]")
-
-        bundle_success, warnings = generate_bundles_for_version(
-            args.version,
-            base_url=args.base_url
-        )
+        bundle_options = {
+            'reproducible': args.reproducible,
+            'compress': args.compress,
+            'sharded': args.sharded,
+            'dedupe_texts': args.dedupe_texts,
+            'render_html': args.render_html,
+            'schema_check': args.schema_check,
+        }
+
+        if args.all_versions:
+            print("\n[Bundle Generation for all versions]")
+
+            bundle_success, warnings = generate_all_bundles(
+                base_url=args.base_url,
+                thumbnail_width=args.thumbnail_width,
+                jobs=args.jobs,
+                force=args.force,
+                options=bundle_options
+            )
+        else:
+            print(f"\n[Bundle Generation for v{args.version}]")
+
+            bundle_success, warnings = generate_bundles_for_version(
+                args.version,
+                base_url=args.base_url,
+                thumbnail_width=args.thumbnail_width,
+                force=args.force,
+                options=bundle_options
+            )
 
         if warnings:
             print("\n" + "=" * 40)